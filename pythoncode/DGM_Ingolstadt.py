@@ -1,29 +1,8 @@
-import xml.etree.ElementTree as ET
-import requests
 import rasterio
 import numpy as np
-import tempfile
-import os
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-
-def get_dgm_url_from_meta4(meta4_file):
-    """Extrahiert die DGM-URL aus der meta4-Datei."""
-    tree = ET.parse(meta4_file)
-    root = tree.getroot()
-    namespace = {'metalink': 'urn:ietf:params:xml:ns:metalink'}
-    url = root.find('.//metalink:url', namespace).text
-    return url
-
-def download_dgm(url):
-    """Lädt die DGM-Datei von der angegebenen URL herunter."""
-    response = requests.get(url)
-    if response.status_code == 200:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.tif') as tmp_file:
-            tmp_file.write(response.content)
-            return tmp_file.name
-    else:
-        raise Exception(f"Kann DGM-Datei nicht herunterladen. HTTP-Statuscode: {response.status_code}")
+from dgm import dgm_aus_meta4
 
 def meter_to_dms(meters, is_latitude):
     """Konvertiert Meter in Grad, Minuten, Sekunden Format mit Richtungsangabe."""
@@ -118,11 +97,8 @@ def main():
     meta4_file = r"C:\Users\uyen truong\Downloads\ingolstadt.meta4"
     
     try:
-        dgm_url = get_dgm_url_from_meta4(meta4_file)
-        print(f"DGM-URL: {dgm_url}")
-        
-        dgm_file = download_dgm(dgm_url)
-        print(f"DGM wurde heruntergeladen nach: {dgm_file}")
+        dgm_file = dgm_aus_meta4(meta4_file)
+        print(f"DGM-Datei (Cache): {dgm_file}")
         
         # TIF-Datei als 3D-Wireframe visualisieren
         output_file = "dgm_3d_wireframe_ingolstadt_updated.png"
@@ -130,12 +106,6 @@ def main():
     
     except Exception as e:
         print(f"Ein Fehler ist aufgetreten: {str(e)}")
-    
-    finally:
-        # Temporäre Datei nach Verwendung löschen
-        if 'dgm_file' in locals():
-            os.unlink(dgm_file)
-            print("Temporäre Datei wurde gelöscht")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
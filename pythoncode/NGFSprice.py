@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import numpy as np
+from abbildungen import abbildung, erstelle_abbildungen
 
 # Daten
 jahre = [2020, 2025, 2030, 2035, 2040, 2045, 2050]
@@ -29,7 +30,7 @@ current_policies = {
 }
 # Funktion zum Erstellen der Diagramme
 def diagramm_erstellen(daten, titel, y_achse):
-    plt.figure(figsize=(12, 6))
+    fig = plt.figure(figsize=(12, 6))
     plt.plot(jahre, net_zero[daten], label='Net Zero 2050', marker='o')
     plt.plot(jahre, disorderly[daten], label='Disorderly', marker='s')
     plt.plot(jahre, below_2[daten], label='Below 2°', marker='^')
@@ -39,9 +40,21 @@ def diagramm_erstellen(daten, titel, y_achse):
     plt.ylabel(y_achse)
     plt.legend()
     plt.grid(True)
-    plt.show()
+    return fig
 
-# Diagramme erstellen
-diagramm_erstellen('gas', 'Gaspreis nach NGFS Szenarien', 'Preis (USD pro Gigajoule)')
-diagramm_erstellen('öl', 'Ölpreis nach NGFS Szenarien', 'Preis (USD pro Gigajoule)')
-diagramm_erstellen('co2_steuer', 'CO2-Steuer nach NGFS Szenarien', 'Preis (USD pro Tonne)')
\ No newline at end of file
+def abbildungen():
+    return [
+        abbildung('figures/ngfs_gas.png', diagramm_erstellen, daten='gas', titel='Gaspreis nach NGFS Szenarien',
+                  y_achse='Preis (USD pro Gigajoule)'),
+        abbildung('figures/ngfs_oel.png', diagramm_erstellen, daten='öl', titel='Ölpreis nach NGFS Szenarien',
+                  y_achse='Preis (USD pro Gigajoule)'),
+        abbildung('figures/ngfs_co2_steuer.png', diagramm_erstellen, daten='co2_steuer',
+                  titel='CO2-Steuer nach NGFS Szenarien', y_achse='Preis (USD pro Tonne)')
+    ]
+
+def main():
+    # Diagramme erstellen (nur geänderte, siehe abbildungen.py)
+    erstelle_abbildungen(abbildungen())
+
+if __name__ == "__main__":
+    main()
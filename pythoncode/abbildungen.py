@@ -0,0 +1,254 @@
+import hashlib
+import importlib
+import json
+import os
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+import pandas as pd
+from zwischenspeicher import datei_sha256
+
+# Hashes der zuletzt erzeugten Abbildungen (Ziel -> Hash über Daten, Parameter und Code)
+ABBILDUNGEN_INDEX = 'cache/abbildungen.json'
+STANDARD_DPI = 300
+
+# Module aus diesem Verzeichnis gehen mit ihrem vollständigen Quelltext in den Hash ein
+PROJEKT_VERZEICHNIS = os.path.dirname(os.path.abspath(__file__))
+
+# Skripte mit einer Funktion ``abbildungen()``, die ihre Abbildungen beschreibt
+SKRIPTE = ['NGFSprice', 'endprice_energy', 'result_transitorisk', 'plot_result_phyrisk', 'bayernmap',
+           'distributed_map_points_flood']
+
+def abbildung(ziel, funktion, quellen=(), savefig=None, vorbereitung=None, **argumente):
+    """Beschreibung einer Abbildung: ``funktion(**argumente)`` zeichnet und gibt die Figure zurück.
+
+    ``quellen``: Dateien, deren Inhalt zusätzlich in den Hash eingeht (z. B. von der Funktion gelesene Daten).
+    ``vorbereitung``: Funktion ohne Argumente, die ein Dictionary mit weiteren Argumenten liefert
+    (z. B. aufwendig geladene Daten). Sie wird nur aufgerufen, wenn die Abbildung neu erstellt werden
+    muss, und für mehrere Abbildungen mit derselben Funktion nur einmal. Ihre Eingangsdaten müssen
+    daher über ``quellen`` angegeben werden.
+    """
+    return {'ziel': ziel, 'funktion': funktion, 'argumente': argumente, 'quellen': list(quellen),
+            'vorbereitung': vorbereitung,
+            'savefig': {'dpi': STANDARD_DPI, 'bbox_inches': 'tight', **(savefig or {})}}
+
+def _fingerabdruck(wert, h):
+    """Schreibt einen inhaltsbasierten Fingerabdruck von ``wert`` in den Hash ``h``."""
+    h.update(type(wert).__name__.encode())
+    if isinstance(wert, pd.DataFrame):
+        _fingerabdruck(list(map(str, wert.columns)), h)
+        _fingerabdruck(wert.index.to_series(), h)
+        for spalte in wert.columns:
+            _fingerabdruck(wert[spalte], h)
+    elif isinstance(wert, pd.Series):
+        h.update(f"{wert.name}|{wert.dtype}|{len(wert)}".encode())
+        if str(wert.dtype) == 'geometry':
+            h.update(b''.join(wert.to_wkb(hex=False).fillna(b'')))
+        else:
+            h.update(pd.util.hash_pandas_object(wert, index=False).to_numpy().tobytes())
+    elif isinstance(wert, np.ndarray):
+        h.update(f"{wert.dtype}|{wert.shape}".encode())
+        h.update(np.ascontiguousarray(wert).tobytes() if wert.dtype != object else repr(wert.tolist()).encode())
+    elif isinstance(wert, dict):
+        for schluessel in sorted(wert, key=repr):
+            _fingerabdruck(schluessel, h)
+            _fingerabdruck(wert[schluessel], h)
+    elif isinstance(wert, (list, tuple, set, frozenset)):
+        werte = sorted(wert, key=repr) if isinstance(wert, (set, frozenset)) else wert
+        h.update(str(len(werte)).encode())
+        for element in werte:
+            _fingerabdruck(element, h)
+    elif callable(wert):
+        h.update(f"{getattr(wert, '__module__', '')}.{getattr(wert, '__qualname__', repr(wert))}".encode())
+    else:
+        h.update(repr(wert).encode())
+
+def _projektmodul(wert):
+    """Modul dieses Projekts, zu dem ``wert`` (Modul, Funktion, Klasse) gehört, sonst None."""
+    modul = wert if isinstance(wert, types.ModuleType) else sys.modules.get(getattr(wert, '__module__', None) or '')
+    datei = getattr(modul, '__file__', None)
+    if datei and os.path.dirname(os.path.abspath(datei)) == PROJEKT_VERZEICHNIS:
+        return modul
+    return None
+
+def _bibliothek(wert):
+    """Name und Version der externen Bibliothek, zu der ``wert`` gehört (z. B. matplotlib, seaborn)."""
+    modulname = wert.__name__ if isinstance(wert, types.ModuleType) else getattr(wert, '__module__', None)
+    if not isinstance(modulname, str) or modulname == 'builtins':
+        return None
+    paket = modulname.split('.')[0]
+    return f"{paket}=={getattr(sys.modules.get(paket), '__version__', '')}"
+
+def _code_fingerabdruck(funktionen, h):
+    """Quelltext aller erreichbaren Projektmodule, Versionen der Bibliotheken und Inhalt der verwendeten globalen Daten.
+
+    Ausgehend von den Modulen der ``funktionen`` werden alle Projektmodule (Dateien in diesem
+    Verzeichnis) vollständig gehasht, die über globale Namen erreichbar sind, z. B. beschriftung.py
+    und kartendetail.py für die Karten. Damit sind auch Einstellungen auf Modulebene wie
+    ``plt.rcParams.update`` erfasst. Hinzu kommen die Versionen der verwendeten Bibliotheken und
+    die matplotlibrc-Datei.
+    """
+    module, offen, bibliotheken = {}, [], set()
+    for funktion in funktionen:
+        modul = _projektmodul(funktion)
+        if modul is not None and os.path.abspath(modul.__file__) not in module:
+            module[os.path.abspath(modul.__file__)] = modul
+            offen.append(modul)
+    while offen:
+        for wert in list(vars(offen.pop()).values()):
+            if not (isinstance(wert, types.ModuleType) or callable(wert)):
+                continue
+            modul = _projektmodul(wert)
+            if modul is None:
+                bibliothek = _bibliothek(wert)
+                if bibliothek:
+                    bibliotheken.add(bibliothek)
+            elif os.path.abspath(modul.__file__) not in module:
+                module[os.path.abspath(modul.__file__)] = modul
+                offen.append(modul)
+
+    # Nach Dateiname statt Modulname, damit der Aufruf als Skript (__main__) denselben Hash ergibt
+    for datei in sorted(module, key=os.path.basename):
+        h.update(os.path.basename(datei).encode())
+        h.update(datei_sha256(datei).encode())
+    _fingerabdruck(sorted(bibliotheken), h)
+    if os.path.exists(matplotlib.matplotlib_fname()):
+        h.update(datei_sha256(matplotlib.matplotlib_fname()).encode())
+
+    # Inhalt der direkt verwendeten globalen Daten (auch wenn sie zur Laufzeit berechnet werden)
+    for funktion in funktionen:
+        namen = set(funktion.__code__.co_names)
+        for konstante in funktion.__code__.co_consts:
+            if isinstance(konstante, types.CodeType):
+                namen.update(konstante.co_names)
+        for name in sorted(namen):
+            wert = funktion.__globals__.get(name)
+            if wert is None or isinstance(wert, types.ModuleType) or callable(wert):
+                continue
+            h.update(name.encode())
+            _fingerabdruck(wert, h)
+
+def abbildungs_hash(spec):
+    h = hashlib.sha256()
+    _code_fingerabdruck([funktion for funktion in (spec['funktion'], spec.get('vorbereitung')) if funktion], h)
+    _fingerabdruck(spec['argumente'], h)
+    _fingerabdruck(spec['savefig'], h)
+    for pfad in spec['quellen']:
+        h.update(datei_sha256(pfad).encode() if os.path.exists(pfad) else f"fehlt:{pfad}".encode())
+    return h.hexdigest()
+
+def _init_worker():
+    matplotlib.use('Agg', force=True)
+
+def _zeichne(spec):
+    """Zeichnet eine Abbildung und speichert sie unter ihrem Ziel (erst als Teildatei, dann umbenannt)."""
+    import matplotlib.pyplot as plt
+    fig = spec['funktion'](**spec['argumente'])
+    if fig is None:
+        fig = plt.gcf()
+    ziel = spec['ziel']
+    os.makedirs(os.path.dirname(ziel) or '.', exist_ok=True)
+    stamm, endung = os.path.splitext(ziel)
+    teil = f"{stamm}.part{endung}"
+    try:
+        fig.savefig(teil, **spec['savefig'])
+    finally:
+        plt.close(fig)
+    os.replace(teil, ziel)
+    return ziel
+
+def erstelle_abbildungen(specs, n_prozesse=None, erzwingen=False, index_datei=ABBILDUNGEN_INDEX):
+    """Erstellt alle Abbildungen mit geändertem Hash auf einem Prozesspool (Backend Agg, ohne Fenster).
+
+    Abbildungen, deren Daten, Parameter und Code seit dem letzten Lauf unverändert sind und deren
+    Datei noch existiert, werden übersprungen. Ohne Pool (eine Abbildung bzw. ``n_prozesse=1``)
+    wird nur dann im eigenen Prozess gezeichnet, wenn dort bereits das Backend Agg aktiv ist.
+    Fehler einzelner Abbildungen werden ausgegeben, die übrigen werden trotzdem erstellt. Unter Windows muss der Aufruf in einem
+    ``if __name__ == "__main__":``-Block stehen.
+    Rückgabe: Dictionary Ziel -> 'erstellt', 'unverändert' oder 'fehler'
+    """
+    index = {}
+    if os.path.exists(index_datei):
+        with open(index_datei, encoding='utf-8') as f:
+            index = json.load(f)
+
+    status, offen = {}, []
+    for spec in specs:
+        spec['hash'] = abbildungs_hash(spec)
+        if not erzwingen and index.get(spec['ziel']) == spec['hash'] and os.path.exists(spec['ziel']):
+            status[spec['ziel']] = 'unverändert'
+        else:
+            offen.append(spec)
+
+    # Aufwendige Vorbereitung nur für neu zu erstellende Abbildungen, je Funktion einmal
+    vorbereitet = {}
+    for spec in list(offen):
+        vorbereitung = spec.get('vorbereitung')
+        if vorbereitung is None:
+            continue
+        if vorbereitung not in vorbereitet:
+            # SystemExit: ältere Skripte beenden sich bei fehlenden Daten mit exit()
+            try:
+                vorbereitet[vorbereitung] = vorbereitung()
+            except (Exception, SystemExit) as e:
+                vorbereitet[vorbereitung] = e
+        if isinstance(vorbereitet[vorbereitung], BaseException):
+            fehler = vorbereitet[vorbereitung]
+            print(f"Fehler bei der Vorbereitung von {spec['ziel']}: {type(fehler).__name__}: {fehler}")
+            status[spec['ziel']] = 'fehler'
+            offen.remove(spec)
+        else:
+            spec['argumente'] = {**vorbereitet[vorbereitung], **spec['argumente']}
+
+    def _fertig(spec, fehler=None):
+        if fehler is None:
+            index[spec['ziel']] = spec['hash']
+            status[spec['ziel']] = 'erstellt'
+        else:
+            print(f"Fehler bei {spec['ziel']}: {fehler}")
+            status[spec['ziel']] = 'fehler'
+
+    # Im eigenen Prozess nur, wenn dort bereits Agg aktiv ist (das Backend des Aufrufers bleibt unverändert)
+    im_prozess = (n_prozesse == 1 or len(offen) <= 1) and matplotlib.get_backend().lower() == 'agg'
+    if offen and im_prozess:
+        for spec in offen:
+            try:
+                _zeichne(spec)
+                _fertig(spec)
+            except Exception as e:
+                _fertig(spec, e)
+    elif offen:
+        # Sonst in eigenen Prozessen (auch für eine einzelne Abbildung)
+        with ProcessPoolExecutor(max_workers=min(n_prozesse or os.cpu_count(), len(offen)),
+                                 initializer=_init_worker) as pool:
+            auftraege = [(spec, pool.submit(_zeichne, spec)) for spec in offen]
+            for spec, auftrag in auftraege:
+                try:
+                    auftrag.result()
+                    _fertig(spec)
+                except Exception as e:
+                    _fertig(spec, e)
+
+    os.makedirs(os.path.dirname(index_datei) or '.', exist_ok=True)
+    with open(index_datei, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    anzahl = {wert: list(status.values()).count(wert) for wert in ('erstellt', 'unverändert', 'fehler')}
+    print(f"Abbildungen: {anzahl['erstellt']} erstellt, {anzahl['unverändert']} unverändert, {anzahl['fehler']} Fehler")
+    return status
+
+def main():
+    # Alle (oder die angegebenen) Skripte: python pythoncode/abbildungen.py [--alle] [Skript ...]
+    argumente = sys.argv[1:]
+    erzwingen = '--alle' in argumente
+    skripte = [name for name in argumente if name != '--alle'] or SKRIPTE
+    matplotlib.use('Agg', force=True)
+    specs = []
+    for name in skripte:
+        specs.extend(importlib.import_module(name).abbildungen())
+    erstelle_abbildungen(specs, erzwingen=erzwingen)
+
+if __name__ == "__main__":
+    main()
@@ -1,104 +1,39 @@
 import geopandas as gpd
 import pandas as pd
 import numpy as np
-from shapely.geometry import Point
-from zipfile import ZipFile
-import tempfile
-import os
+from hochwasserzonen import bestimme_hochwasserrisiko, lade_hochwasserereignisse, weise_hq_zu
+from plz_bayern import lade_plz_bayern
+from punktverteilung import SAAT, verteile_anzahl, verteile_punkte
 
 # Pfad zur ZIP-Datei mit den Hochwasserdaten
 flood_zip_path = r"C:\Users\uyen truong\Desktop\Hochschule-Muenchen-LaTeX-Template\data\hochwasserereignisse_epsg4258_shp.zip"
 
-# Lesen der PLZ-Daten (Postleitzahl) aus der Shapefile
+# PLZ-Gebiete (Postleitzahl) Bayerns mit Regionsdaten, bereits in EPSG:3035
+# (vorbereitete Datei, wird nur bei geänderten Quelldateien neu erstellt, siehe plz_bayern.py)
 zip_path = r"C:\Users\uyen truong\Desktop\Hochschule-Muenchen-LaTeX-Template\data\plz-5stellig.shp.zip"
-shp_name = 'plz-5stellig'
-full_path = f"zip://{zip_path}!{shp_name}.shp"
-plz_shape_df = gpd.read_file(full_path, dtype={'plz': str})
+bayern_df = lade_plz_bayern(zip_path)
 
-# Lesen der Regionsdaten aus der CSV-Datei
-plz_region_df = pd.read_csv('data\zuordnung_plz_ort.csv', sep=',', dtype={'plz': str})
-plz_region_df.drop('osm_id', axis=1, inplace=True)
-
-# Zusammenführen der Shapefile-Daten mit den Regionsdaten
-germany_df = pd.merge(left=plz_shape_df, right=plz_region_df, on='plz', how='inner')
-germany_df.drop(['note'], axis=1, inplace=True)
-
-# Daten für Bayern filtern
-bayern_df = germany_df.query('bundesland == "Bayern"')
-
-# Hochwasserdaten aus der ZIP-Datei lesen
-with tempfile.TemporaryDirectory() as tmpdir:
-    with ZipFile(flood_zip_path, 'r') as zip_ref:
-        zip_ref.extractall(tmpdir)
-    shp_files = [f for f in os.listdir(tmpdir) if f.endswith('.shp')]
-    if not shp_files:
-        raise FileNotFoundError("Keine .shp-Datei in der ZIP gefunden")
-    flood_data = gpd.read_file(os.path.join(tmpdir, shp_files[0]))
-
-# Koordinatensystem in ein projiziertes System (EPSG:3035) umwandeln, bevor der Centroid berechnet wird
-bayern_df = bayern_df.to_crs("EPSG:3035")
-flood_data = flood_data.to_crs("EPSG:3035")
-
-# Berechnung der Gesamtbevölkerung
-total_population = bayern_df['einwohner'].sum()
+# Hochwasserdaten direkt aus der ZIP-Datei lesen, bereits in EPSG:3035 und mit gültigen Geometrien
+# (vorbereitete Datei, wird nur bei geänderter ZIP-Datei neu erstellt, siehe hochwasserzonen.py)
+flood_data = lade_hochwasserereignisse(flood_zip_path)
 
 # Berechnung der Anzahl der zu verteilenden Punkte basierend auf der Bevölkerungszahl jeder Region
-bayern_df['points'] = (bayern_df['einwohner'] / total_population * 3853).round().astype(int)
-
-# Sicherstellen, dass die Gesamtpunktzahl 3853 beträgt (aufgrund von Rundungen)
-difference = 3853 - bayern_df['points'].sum()
-if difference != 0:
-    max_index = bayern_df['points'].idxmax()
-    bayern_df.at[max_index, 'points'] += difference
-
-# Funktion zur Bestimmung des Hochwasserrisikos (überarbeitet)
-def determine_flood_risk(hq_value):
-    if pd.isnull(hq_value):
-        return 'very low'
-    elif hq_value in ['HQ 20', 'HQ 30']:
-        return 'high'
-    elif hq_value in ['HQ 40', 'HQ 50', 'HQ 80']:
-        return 'medium'
-    elif hq_value in ['HQ 100', 'HQ 200']:
-        return 'low'
-    else:
-        return 'very low'
+# (Verfahren der größten Reste, die Summe ist genau 3853)
+bayern_df['points'] = verteile_anzahl(bayern_df['einwohner'], 3853)
 
 # Erstellen von zufälligen Punkten in jeder Region und Erstellen eines DataFrames dafür
-points = []
-data = []
-for idx, row in bayern_df.iterrows():
-    num_points = row['points']
-    polygon = row['geometry']
-    minx, miny, maxx, maxy = polygon.bounds
-    for _ in range(num_points):
-        while True:
-            random_point = Point(np.random.uniform(minx, maxx), np.random.uniform(miny, maxy))
-            if polygon.contains(random_point):
-                points.append(random_point)
-                data.append({
-                    'ort': row['ort'],
-                    'landkreis': row['landkreis'],
-                    'latitude': random_point.y,
-                    'longitude': random_point.x
-                })
-                break
+# (alle Punkte einer Region in einem Schritt, je PLZ ein eigener Zufallsstrom -> reproduzierbar)
+data = verteile_punkte(bayern_df, bayern_df['points'], spalten=('ort', 'landkreis'), saat=SAAT)
 
 # Punkte in ein GeoDataFrame umwandeln
-points_gdf = gpd.GeoDataFrame(data, geometry=points, crs="EPSG:3035")
-
-# Hinzufügen der Spalte GEB_HQ zu points_gdf und Überprüfung, ob sich der Punkt im Hochwassergebiet befindet
-points_gdf['GEB_HQ'] = None
+points_gdf = gpd.GeoDataFrame(data, geometry=gpd.points_from_xy(data['longitude'], data['latitude']), crs="EPSG:3035")
 
-for idx, point in points_gdf.iterrows():
-    # Überprüfen, ob der Punkt in einem Hochwassergebiet liegt
-    in_flood_area = flood_data[flood_data.contains(point.geometry)]
-    if not in_flood_area.empty:
-        # Wenn der Punkt in einem Hochwassergebiet liegt, wird der Wert GEB_HQ übernommen (einschließlich None)
-        points_gdf.at[idx, 'GEB_HQ'] = in_flood_area.iloc[0]['GEB_HQ']
+# Hinzufügen der Spalte GEB_HQ zu points_gdf: räumlicher Join aller Punkte mit den Hochwassergebieten
+# (bei überlappenden Gebieten zählt das kürzeste Wiederkehrintervall)
+points_gdf['GEB_HQ'] = weise_hq_zu(points_gdf, flood_data)
 
 # Hinzufügen der Spalte flood_risk basierend auf dem Wert GEB_HQ
-points_gdf['flood_risk'] = points_gdf['GEB_HQ'].apply(determine_flood_risk)
+points_gdf['flood_risk'] = bestimme_hochwasserrisiko(points_gdf['GEB_HQ'])
 
 # Anzeige des DataFrames
 print(points_gdf.head())
@@ -1,86 +1,30 @@
 import geopandas as gpd
 import pandas as pd
 import numpy as np
-from shapely.geometry import Point
 import matplotlib.pyplot as plt
+from punktverteilung import SAAT, verteile_anzahl, verteile_punkte
 
-# Load the shapefile
-zip_path = r"C:\Users\uyen truong\Desktop\Hochschule-Muenchen-LaTeX-Template\data\plz-5stellig.shp.zip"
-shp_name = 'plz-5stellig'
-full_path = f"zip://{zip_path}!{shp_name}.shp"
-plz_shape_df = gpd.read_file(full_path, dtype={'plz': str})
 plt.rcParams['figure.figsize'] = [16, 11] 
 
-# Load the regional data
-plz_region_df = pd.read_csv('data/zuordnung_plz_ort.csv', sep=',', dtype={'plz': str})
-
-# Prepare the data by merging the shapefile and population data
-plz_region_df.drop('osm_id', axis=1, inplace=True)
-germany_df = pd.merge(left=plz_shape_df, right=plz_region_df, on='plz', how='inner')
-germany_df.drop(['note'], axis=1, inplace=True)
-
-# Filter for Bayern
-bayern_df = germany_df.query('bundesland == "Bayern"')
-
-# Load the Shapefile back into a GeoDataFrame
+# Load the Bavarian PLZ regions with flood attributes (the plain PLZ layer is prepared by plz_bayern.py)
 bayern_df = gpd.read_file("data/flutbayern_shapefile_test.shp")
 
 # Adjust CRS to reduce distortion
 bayern_df = bayern_df.to_crs("EPSG:3035") 
 
-# Calculate the total population
-total_population = bayern_df['einwohner'].sum()
-
 # Calculate the number of points to assign to each region based on its population
-bayern_df['points'] = (bayern_df['einwohner'] / total_population * 3853).round().astype(int)
-
-# Ensure the sum of points equals 3853
-total_points = bayern_df['points'].sum()
-difference = 3853 - total_points
-
-# Adjust points to ensure the total matches exactly 3853
-if difference != 0:
-    # Adjust the number of points in regions with the maximum points
-    adjustment_index = bayern_df['points'].nlargest(abs(difference)).index
-    for idx in adjustment_index:
-        if difference > 0:
-            bayern_df.at[idx, 'points'] += 1
-            difference -= 1
-        elif difference < 0:
-            bayern_df.at[idx, 'points'] -= 1
-            difference += 1
-        if difference == 0:
-            break
+# (largest remainder method, the sum is exactly 3853)
+bayern_df['points'] = verteile_anzahl(bayern_df['einwohner'], 3853)
 
 # Generate random points within each region and create a DataFrame for them
-points = []
-data = []
-for idx, row in bayern_df.iterrows():
-    num_points = row['points']
-    polygon = row['geometry']
-    minx, miny, maxx, maxy = polygon.bounds
-    for _ in range(num_points):
-        while True:
-            random_point = Point(np.random.uniform(minx, maxx), np.random.uniform(miny, maxy))
-            if polygon.contains(random_point):
-                points.append(random_point)
-                data.append({
-                    'plz': row['plz'],
-                    'ort': row['ort'],
-                    'landkreis': row['landkreis'],
-                    'latitude': random_point.y,
-                    'longitude': random_point.x,
-                    'fluvial': row['Fluvial'],
-                    'AEP': row['AEP'],
-                    'floodrisk': row['floodrisk']
-                })
-                break
+# (all points of a region are drawn at once, one seeded random stream per PLZ -> reproducible)
+points_df = verteile_punkte(bayern_df, bayern_df['points'],
+                            spalten=('plz', 'ort', 'landkreis', 'Fluvial', 'AEP', 'floodrisk'), saat=SAAT)
+points_df = points_df.rename(columns={'Fluvial': 'fluvial'})
+points_df = points_df[['plz', 'ort', 'landkreis', 'latitude', 'longitude', 'fluvial', 'AEP', 'floodrisk']]
 
 # Convert the points to a GeoDataFrame
-points_gdf = gpd.GeoDataFrame(geometry=points, crs=bayern_df.crs)
-
-# Convert the data list to a DataFrame
-points_df = pd.DataFrame(data)
+points_gdf = gpd.GeoDataFrame(geometry=gpd.points_from_xy(points_df['longitude'], points_df['latitude']), crs=bayern_df.crs)
 print(f'Number of data points: {points_df.shape[0]}')
 
 # Ensure that we have exactly 3853 points
@@ -1,27 +1,14 @@
 import geopandas as gpd
 import pandas as pd
-from zipfile import ZipFile
-import os
-import tempfile
+from hochwasserzonen import lade_hochwasserereignisse
 
 # Pfad zur Zip-Datei
 zip_path = r"C:\Users\uyen truong\Downloads\hochwasserereignisse_epsg4258_shp (3).zip"
 
-# Temporäres Verzeichnis erstellen, um die Datei zu entpacken
-with tempfile.TemporaryDirectory() as tmpdir:
-    with ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(tmpdir)
-    
-    # Die .shp-Datei im temporären Verzeichnis suchen
-    shp_files = [f for f in os.listdir(tmpdir) if f.endswith('.shp')]
-    
-    if not shp_files:
-        raise FileNotFoundError("Keine .shp-Datei im Zip gefunden")
-    
-    # Die erste Shapefile-Datei lesen (angenommen, es handelt sich um die Datei mit den Hochwasserdaten)
-    shapefile_path = os.path.join(tmpdir, shp_files[0])
-    gdf = gpd.read_file(shapefile_path)
-    unique_geb_hq = gdf['GEB_HQ'].unique()
+# Hochwasserdaten direkt aus der Zip-Datei lesen (ohne Entpacken; die vorbereitete Datei in EPSG:3035
+# wird nur bei geänderter Zip-Datei neu erstellt, siehe hochwasserzonen.py)
+gdf = lade_hochwasserereignisse(zip_path)
+unique_geb_hq = gdf['GEB_HQ'].unique()
 
 # Alle Spaltennamen ausgeben
 for col in gdf.columns:
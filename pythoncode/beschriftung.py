@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+import numpy as np
+from matplotlib.font_manager import FontProperties
+
+# Kandidatenpositionen (Richtung x, y) in der Reihenfolge der Bevorzugung: rechts oben zuerst
+POSITIONEN = [(1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1)]
+AUSRICHTUNG_X = {1: 'left', 0: 'center', -1: 'right'}
+AUSRICHTUNG_Y = {1: 'bottom', 0: 'center', -1: 'top'}
+
+def _ueberlappt(box, andere):
+    return any(box[0] < b[2] and b[0] < box[2] and box[1] < b[3] and b[1] < box[3] for b in andere)
+
+def _zellen(box, zellgroesse):
+    """Rasterzellen (Pixelkoordinaten), die ein Rechteck (x0, y0, x1, y1) berührt."""
+    i0, j0, i1, j1 = (int(np.floor(wert / zellgroesse)) for wert in box)
+    return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+def _frei(raster, box, zellgroesse):
+    return not any(_ueberlappt(box, raster[zelle]) for zelle in _zellen(box, zellgroesse) if zelle in raster)
+
+def _belege(raster, box, zellgroesse):
+    for zelle in _zellen(box, zellgroesse):
+        raster[zelle].append(box)
+
+def _textmasse(text, renderer, schrift, glyphen):
+    """Breite und Höhe (Pixel) eines einzeiligen Textes aus zwischengespeicherten Zeichenmaßen.
+
+    Die Höhe folgt dem Textlayout von matplotlib (mindestens die Zeilenhöhe von 'lp'); die Breite
+    ist die Summe der Zeichenbreiten und damit eher etwas zu groß.
+    """
+    breite, oberlaenge, unterlaenge = 0.0, glyphen['lp'][1], glyphen['lp'][2]
+    for zeichen in text:
+        if zeichen not in glyphen:
+            w, h, d = renderer.get_text_width_height_descent(zeichen, schrift, ismath=False)
+            glyphen[zeichen] = (w, h - d, d)
+        w, oben, unten = glyphen[zeichen]
+        breite += w
+        oberlaenge, unterlaenge = max(oberlaenge, oben), max(unterlaenge, unten)
+    return breite, oberlaenge + unterlaenge
+
+def platziere_beschriftungen(ax, x, y, texte, prioritaet=None, fontsize=9, abstand=3, rand=1, punkt_radius=2,
+                             **text_kwargs):
+    """Beschriftet Punkte ohne Überlappung; Beschriftungen ohne freien Platz werden weggelassen.
+
+    Die Punkte werden nach absteigender ``prioritaet`` (z. B. Einwohnerzahl) abgearbeitet. Für jeden
+    Punkt werden acht Positionen um den Punkt geprüft und die erste freie gewählt. Die Kollisionsprüfung
+    erfolgt in Pixelkoordinaten über ein Raster, der Aufwand wächst daher etwa linear mit der Anzahl.
+    Die Achsengrenzen müssen bereits feststehen (nach dem Zeichnen der Karte aufrufen).
+    ``abstand``, ``rand`` (Innenabstand wie bbox pad) und ``punkt_radius`` in Punkten.
+    Rückgabe: Liste der gesetzten Text-Objekte
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    texte = list(texte)
+    reihenfolge = np.argsort(-np.asarray(prioritaet, dtype=float), kind='stable') if prioritaet is not None \
+        else np.arange(len(texte))
+
+    figur = ax.figure
+    ax.apply_aspect()
+    renderer = figur.canvas.get_renderer()
+    pixel_pro_punkt = figur.dpi / 72
+    schrift = FontProperties(size=fontsize)
+    anker = ax.transData.transform(np.column_stack([x, y])) if len(texte) else np.empty((0, 2))
+    achse = ax.get_window_extent(renderer)
+
+    abstand_px, rand_px, radius_px = abstand * pixel_pro_punkt, rand * pixel_pro_punkt, punkt_radius * pixel_pro_punkt
+    w, h, d = renderer.get_text_width_height_descent('lp', schrift, ismath=False)
+    glyphen = {'lp': (w, h - d, d)}
+    zellgroesse = max(h + 2 * rand_px, 1) * 4
+    daten = ax.transData.inverted()
+    raster = defaultdict(list)
+
+    # Punkte selbst freihalten, damit Beschriftungen keine anderen Orte verdecken
+    for px, py in anker:
+        _belege(raster, (px - radius_px, py - radius_px, px + radius_px, py + radius_px), zellgroesse)
+
+    gesetzt = []
+    for i in reihenfolge:
+        px, py = anker[i]
+        breite, hoehe = _textmasse(str(texte[i]), renderer, schrift, glyphen)
+        breite, hoehe = breite + 2 * rand_px, hoehe + 2 * rand_px
+        for dx, dy in POSITIONEN:
+            links = px + dx * abstand_px - (breite if dx < 0 else breite / 2 if dx == 0 else 0)
+            unten = py + dy * abstand_px - (hoehe if dy < 0 else hoehe / 2 if dy == 0 else 0)
+            box = (links, unten, links + breite, unten + hoehe)
+            innerhalb = achse.x0 <= box[0] and box[2] <= achse.x1 and achse.y0 <= box[1] and box[3] <= achse.y1
+            if innerhalb and _frei(raster, box, zellgroesse):
+                _belege(raster, box, zellgroesse)
+                # Textanker um den Innenabstand versetzt, damit der Hintergrund genau das Rechteck füllt
+                versatz = abstand_px + rand_px
+                ziel = daten.transform((px + dx * versatz, py + dy * versatz))
+                gesetzt.append(ax.text(ziel[0], ziel[1], texte[i], fontsize=fontsize, ha=AUSRICHTUNG_X[dx],
+                                       va=AUSRICHTUNG_Y[dy], **text_kwargs))
+                break
+    return gesetzt
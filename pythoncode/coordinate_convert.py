@@ -1,11 +1,8 @@
-from pyproj import Transformer, CRS
+from koordinaten import transformiere
 
 def convert_coordinates(easting, northing, from_epsg=3035, to_epsg=25832):
-    # Tạo đối tượng Transformer
-    transformer = Transformer.from_crs(f"EPSG:{from_epsg}", f"EPSG:{to_epsg}", always_xy=True)
-    
-    # Thực hiện chuyển đổi
-    easting_converted, northing_converted = transformer.transform(easting, northing)
+    # Thực hiện chuyển đổi (Transformer được lưu đệm trong koordinaten)
+    easting_converted, northing_converted = transformiere(easting, northing, from_epsg, to_epsg)
     
     return easting_converted, northing_converted
 
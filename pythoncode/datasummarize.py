@@ -1,33 +1,25 @@
 import pandas as pd
 import numpy as np
+from einlesen import konvertiere_numerische_spalten
+from portfolio_store import lade_portfolio, schreibe_portfolio, store_pfad
 
 # Daten von CSV-Datei lesen
-df = pd.read_csv('data/hypothekendaten_final_with_statistics.csv', delimiter=';')
+df = lade_portfolio('data/hypothekendaten_final_with_statistics.csv')
 
 # ID-Spalte hinzufügen, falls sie nicht vorhanden ist
 if 'ID' not in df.columns:
     df['ID'] = range(1, len(df) + 1)
 
-# Flexible Konvertierungsfunktion
-def flexible_numeric_conversion(value, decimals=2):
-    if isinstance(value, str):
-        try:
-            return round(float(value.replace(',', '.')), decimals)
-        except ValueError:
-            return np.nan
-    elif isinstance(value, (int, float)):
-        return round(value, decimals)
-    else:
-        return np.nan
-
-# Umwandlung der numerischen Spalten
+# Umwandlung der numerischen Spalten (Dezimalkomma, auf 2 Stellen gerundet)
 numeric_columns = ['Quadratmeterpreise', 'wohnflaeche','aktueller_immobilienwert', 'aktuelles_LtV', 'darlehenbetrag']
-for col in numeric_columns:
-    df[col] = df[col].apply(lambda x: flexible_numeric_conversion(x))
+konvertiere_numerische_spalten(df, numeric_columns, decimals=2)
 
 # Speichern der aktualisierten Daten in eine neue CSV-Datei
 df.to_csv('data/hypothekendaten_final_with_id.csv', index=False, sep=';')
 
+# Zusätzlich typisiert als Parquet speichern, damit die Auswertungsskripte nicht erneut parsen müssen
+schreibe_portfolio(df, store_pfad('data/hypothekendaten_final_with_id.csv'))
+
 # Ausgabe aller Spaltennamen
 print("Spaltennamen:")
 print(df.columns.tolist())
@@ -0,0 +1,495 @@
+import glob
+import hashlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+import numpy as np
+import rasterio
+import requests
+from rasterio.coords import BoundingBox
+from rasterio.windows import Window
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# Lokaler Cache für heruntergeladene DGM-Kacheln
+DGM_CACHE_VERZEICHNIS = os.environ.get('DGM_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'dgm'))
+DGM_CACHE_MAX_BYTES = int(os.environ.get('DGM_CACHE_MAX_BYTES', 20 * 1024 ** 3))
+
+# Mehrere Prozesse können den Cache gleichzeitig nutzen: Dateisperren für den Index und je Download.
+# Kacheln, die innerhalb der Schutzfrist genutzt wurden, werden nicht entfernt (ein anderer Prozess
+# liest sie womöglich gerade); der Cache kann die Größengrenze dadurch vorübergehend überschreiten.
+DGM_CACHE_SCHUTZFRIST = 600
+
+METALINK_NS = {'metalink': 'urn:ietf:params:xml:ns:metalink'}
+
+# Blockgröße beim Herunterladen und Anzahl der Versuche je URL (mit Fortsetzung)
+DOWNLOAD_BLOCKGROESSE = 256 * 1024
+DOWNLOAD_VERSUCHE = 5
+DOWNLOAD_TIMEOUT = 60
+
+# Namen der Hash-Typen in meta4-Dateien -> hashlib
+HASH_TYPEN = {'sha-256': 'sha256', 'sha-1': 'sha1', 'md5': 'md5', 'sha-512': 'sha512'}
+
+def get_dgm_url_from_meta4(meta4_file):
+    """Extrahiert die erste DGM-URL aus der meta4-Datei."""
+    return lese_meta4(meta4_file)[0]['urls'][0]
+
+def lese_meta4(meta4_file):
+    """Liest alle Dateien einer meta4-Datei mit Name, URLs (nach Priorität sortiert), Größe und Hashes."""
+    root = ET.parse(meta4_file).getroot()
+    dateien = []
+    for datei in root.findall('metalink:file', METALINK_NS):
+        groesse = datei.find('metalink:size', METALINK_NS)
+        # Kleinere Priorität = bevorzugter Spiegelserver, URLs ohne Angabe zuletzt
+        urls = sorted(datei.findall('metalink:url', METALINK_NS), key=lambda url: float(url.get('priority', math.inf)))
+        dateien.append({
+            'name': datei.get('name'),
+            'urls': [url.text.strip() for url in urls],
+            'groesse': int(groesse.text) if groesse is not None else None,
+            'hashes': {h.get('type'): h.text.strip().lower() for h in datei.findall('metalink:hash', METALINK_NS)}
+        })
+    return dateien
+
+def _gesamtgroesse(response):
+    """Liest die Gesamtgröße der Datei aus Content-Range bzw. Content-Length."""
+    if response.status_code == 206 and '/' in response.headers.get('Content-Range', ''):
+        gesamt = response.headers['Content-Range'].rsplit('/', 1)[1]
+        return int(gesamt) if gesamt != '*' else None
+    if response.status_code == 200 and 'Content-Length' in response.headers:
+        return int(response.headers['Content-Length'])
+    return None
+
+def download_dgm(url, ziel=None, groesse=None, blockgroesse=DOWNLOAD_BLOCKGROESSE, versuche=DOWNLOAD_VERSUCHE,
+                 timeout=DOWNLOAD_TIMEOUT):
+    """Lädt die DGM-Datei blockweise nach ``ziel`` (Standard: temporäre Datei) herunter.
+
+    Ist ``ziel`` bereits teilweise vorhanden oder bricht die Verbindung ab, wird die
+    Übertragung per HTTP-Range-Anfrage an der bisherigen Dateigröße fortgesetzt.
+    """
+    if ziel is None:
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.tif') as tmp_file:
+            ziel = tmp_file.name
+
+    for versuch in range(1, versuche + 1):
+        vorhanden = os.path.getsize(ziel) if os.path.exists(ziel) else 0
+        if groesse is not None and vorhanden == groesse:
+            return ziel
+        headers = {'Range': f'bytes={vorhanden}-'} if vorhanden else {}
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 416:
+                    # Teildatei passt nicht zur Datei auf dem Server: von vorne beginnen
+                    os.unlink(ziel)
+                    continue
+                if response.status_code not in (200, 206):
+                    raise Exception(f"Das DGM konnte nicht heruntergeladen werden. HTTP-Statuscode: {response.status_code}")
+                if groesse is None:
+                    groesse = _gesamtgroesse(response)
+                # Bei 200 unterstützt der Server keine Range-Anfragen: Datei neu schreiben
+                with open(ziel, 'ab' if response.status_code == 206 else 'wb') as f:
+                    for block in response.iter_content(blockgroesse):
+                        f.write(block)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            print(f"Download unterbrochen ({versuch}/{versuche}): {e}")
+            time.sleep(min(2 ** versuch, 30))
+            continue
+
+        geladen = os.path.getsize(ziel)
+        if groesse is None or geladen == groesse:
+            return ziel
+        if geladen > groesse:
+            os.unlink(ziel)
+            raise Exception(f"Das DGM ist größer als erwartet ({geladen} statt {groesse} Bytes): {url}")
+        print(f"Download unvollständig ({geladen}/{groesse} Bytes), setze fort: {url}")
+
+    raise Exception(f"Das DGM konnte nach {versuche} Versuchen nicht vollständig heruntergeladen werden: {url}")
+
+def download_mit_spiegeln(urls, ziel, groesse=None, hashes=None, **kwargs):
+    """Lädt eine Datei von der ersten funktionierenden URL und prüft den Hash.
+
+    Eine Teildatei eines ausgefallenen Spiegelservers wird beim nächsten fortgesetzt.
+    Rückgabe: die URL, von der die Datei vollständig geladen wurde.
+    """
+    if isinstance(urls, str):
+        urls = [urls]
+    hash_typ, erwarteter_hash = _bevorzugter_hash(hashes or {})
+    fehler = []
+    for url in urls:
+        try:
+            download_dgm(url, ziel, groesse, **kwargs)
+        except Exception as e:
+            print(f"Spiegelserver fehlgeschlagen: {url} ({e})")
+            fehler.append(f"{url}: {e}")
+            continue
+        if erwarteter_hash and datei_hash(ziel, hash_typ) != erwarteter_hash:
+            os.unlink(ziel)
+            print(f"Prüfsumme stimmt nicht überein ({hash_typ}): {url}")
+            fehler.append(f"{url}: Prüfsumme ({hash_typ}) stimmt nicht überein")
+            continue
+        return url
+    raise Exception(f"Das DGM konnte von keiner URL geladen werden: {'; '.join(fehler)}")
+
+def load_dgm(file_path, fenster=None, memmap=False):
+    """Lädt das DGM (Band 1) mit Transformation, Koordinatensystem und Umfang.
+
+    Mit ``fenster`` (rasterio Window) wird nur dieser Ausschnitt gelesen; Transformation und
+    Umfang beziehen sich dann auf den Ausschnitt. Mit ``memmap=True`` wird ein unkomprimiertes
+    GeoTIFF ohne Kopie in den Speicher eingeblendet (sonst normales Lesen).
+    """
+    with rasterio.open(file_path) as src:
+        if fenster is not None:
+            elevation = src.read(1, window=fenster)
+            transform = src.window_transform(fenster)
+            bounds = BoundingBox(*src.window_bounds(fenster))
+        else:
+            elevation = _memmap_band(src) if memmap else None
+            if elevation is None:
+                elevation = src.read(1)
+            transform = src.transform
+            bounds = src.bounds
+        crs = src.crs
+        print(f"Umfang des DGM (Bounding Box): {bounds}")
+    return elevation, transform, crs, bounds
+
+def _memmap_band(src, band=1):
+    """Blendet Band ``band`` eines unkomprimierten GeoTIFF per np.memmap ein, falls die Daten zusammenhängend liegen."""
+    if src.driver != 'GTiff' or src.compression is not None or (src.count > 1 and src.interleaving.name != 'BAND'):
+        return None
+    block_hoehe, block_breite = src.block_shapes[band - 1]
+    if block_breite != src.width:
+        return None  # gekachelt: Blöcke liegen nicht zeilenweise hintereinander
+    anzahl_bloecke = -(-src.height // block_hoehe)
+    erster = src.get_tag_item('BLOCK_OFFSET_0_0', 'TIFF', bidx=band)
+    letzter = src.get_tag_item(f'BLOCK_OFFSET_0_{anzahl_bloecke - 1}', 'TIFF', bidx=band)
+    if erster is None or letzter is None:
+        return None
+    dtype = np.dtype(src.dtypes[band - 1])
+    if int(letzter) - int(erster) != (anzahl_bloecke - 1) * block_hoehe * src.width * dtype.itemsize:
+        return None
+    return np.memmap(src.name, dtype=dtype, mode='r', offset=int(erster), shape=(src.height, src.width))
+
+def pixel_index(transform, x, y):
+    """Gerundete Pixelindizes (Zeile, Spalte) von Koordinaten, wie in ``get_elevation_at_point``."""
+    col, row = ~transform * (np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    return np.round(row).astype(int), np.round(col).astype(int)
+
+def fenster_um_punkt(file_path, x, y, radius=1):
+    """Fenster von (2 * radius + 1)² Pixeln um den Punkt (x, y), auf das DGM beschnitten."""
+    with rasterio.open(file_path) as src:
+        row, col = pixel_index(src.transform, x, y)
+        zeile_von, zeile_bis = np.clip([row - radius, row + radius + 1], 0, src.height)
+        spalte_von, spalte_bis = np.clip([col - radius, col + radius + 1], 0, src.width)
+    return Window(int(spalte_von), int(zeile_von), int(spalte_bis - spalte_von), int(zeile_bis - zeile_von))
+
+def _im_dgm(src, x, y):
+    """Maske der Punkte innerhalb des DGM-Umfangs (links/unten einschließlich)."""
+    return (src.bounds.left <= x) & (x < src.bounds.right) & (src.bounds.bottom <= y) & (y < src.bounds.top)
+
+def _nodata_zu_nan(src, werte):
+    werte = werte.astype(float)
+    if src.nodata is not None:
+        werte[werte == src.nodata] = np.nan
+    return werte
+
+def _pixel_im_dgm(src, x, y):
+    """Gerundete Pixelindizes und Maske der Punkte, deren Pixel im DGM liegt."""
+    rows, cols = pixel_index(src.transform, x, y)
+    return rows, cols, (rows >= 0) & (rows < src.height) & (cols >= 0) & (cols < src.width)
+
+def _hoehen_naechstes_pixel(src, x, y, umfang_pruefen=True):
+    """Höhe des (gerundeten) Pixels wie in ``get_elevation_at_point``; liest nur betroffene Blöcke."""
+    rows, cols, innen = _pixel_im_dgm(src, x, y)
+    hoehen = np.full(x.shape, np.nan)
+    if umfang_pruefen:
+        innen &= _im_dgm(src, x, y)
+
+    band = _memmap_band(src)
+    if band is not None:
+        hoehen[innen] = _nodata_zu_nan(src, band[rows[innen], cols[innen]])
+        return hoehen
+
+    block_hoehe, block_breite = src.block_shapes[0]
+    bloecke_je_zeile = -(-src.width // block_breite)
+    block_nr = (rows // block_hoehe) * bloecke_je_zeile + cols // block_breite
+    for nr in np.unique(block_nr[innen]):
+        fenster = src.block_window(1, *divmod(int(nr), bloecke_je_zeile))
+        block = src.read(1, window=fenster)
+        auswahl = innen & (block_nr == nr)
+        hoehen[auswahl] = _nodata_zu_nan(src, block[rows[auswahl] - fenster.row_off, cols[auswahl] - fenster.col_off])
+    return hoehen
+
+def _hoehen_bilinear(src, x, y):
+    """Bilinear zwischen den vier umliegenden Pixelmitten interpolierte Höhe."""
+    hoehen = np.full(x.shape, np.nan)
+    innen = _im_dgm(src, x, y)
+    if not innen.any():
+        return hoehen
+
+    # Kontinuierliche Pixelkoordinaten bezogen auf die Pixelmitten
+    col, row = ~src.transform * (x[innen], y[innen])
+    col, row = col - 0.5, row - 0.5
+    col0 = np.clip(np.floor(col).astype(int), 0, max(src.width - 2, 0))
+    row0 = np.clip(np.floor(row).astype(int), 0, max(src.height - 2, 0))
+    fx = np.clip(col - col0, 0, 1)
+    fy = np.clip(row - row0, 0, 1)
+
+    # Ein Fenster um alle Punkte der Kachel lesen
+    fenster = Window(int(col0.min()), int(row0.min()),
+                     min(int(col0.max()) + 2, src.width) - int(col0.min()),
+                     min(int(row0.max()) + 2, src.height) - int(row0.min()))
+    daten = _nodata_zu_nan(src, src.read(1, window=fenster))
+    r = row0 - fenster.row_off
+    c = col0 - fenster.col_off
+    r1 = np.minimum(r + 1, daten.shape[0] - 1)
+    c1 = np.minimum(c + 1, daten.shape[1] - 1)
+
+    hoehen[innen] = ((1 - fx) * (1 - fy) * daten[r, c] + fx * (1 - fy) * daten[r, c1]
+                     + (1 - fx) * fy * daten[r1, c] + fx * fy * daten[r1, c1])
+    return hoehen
+
+def hoehen_an_punkten(file_path, x, y, bilinear=False, umfang_pruefen=True):
+    """Liest die Geländehöhe an vielen Punkten (Koordinaten im System des DGM).
+
+    Standard ist das nächste Pixel; es werden nur die internen Blöcke (Kacheln bzw. Streifen)
+    mit Punkten gelesen, bei unkomprimierten Dateien direkt aus dem memory-mapped Band.
+    Mit ``bilinear=True`` wird zwischen den Pixelmitten interpoliert. Außerhalb/NoData: NaN.
+    ``umfang_pruefen=False`` prüft beim nächsten Pixel nur den Pixelindex (Punkte am Rand
+    einer Nachbarkachel, deren gerundetes Pixel in dieser Kachel liegt).
+    """
+    x, y = np.broadcast_arrays(np.atleast_1d(np.asarray(x, dtype=float)), np.atleast_1d(np.asarray(y, dtype=float)))
+    with rasterio.open(file_path) as src:
+        if bilinear:
+            return _hoehen_bilinear(src, x, y)
+        return _hoehen_naechstes_pixel(src, x, y, umfang_pruefen)
+
+def hoehen_aus_kacheln(kacheln, x, y, bilinear=False):
+    """Geländehöhen für viele Punkte aus mehreren DGM-Kacheln (Koordinaten im System der Kacheln).
+
+    Die Punkte werden nach Kachel gruppiert, jede Kachel wird einmal geöffnet und gelesen.
+    Beim nächsten Pixel zählt die Kachel, in der das gerundete Pixel liegt (wie bei einem
+    zusammenhängenden DGM), bei ``bilinear`` die erste Kachel, in der der Punkt liegt.
+    Rückgabe: (Höhen, Maske der Punkte außerhalb aller Kacheln)
+    """
+    x, y = np.broadcast_arrays(np.atleast_1d(np.asarray(x, dtype=float)), np.atleast_1d(np.asarray(y, dtype=float)))
+    hoehen = np.full(x.shape, np.nan)
+    ausserhalb = np.ones(x.shape, dtype=bool)
+    offen = np.ones(x.shape, dtype=bool)
+    for pfad in kacheln:
+        with rasterio.open(pfad) as src:
+            im_umfang = _im_dgm(src, x, y)
+            if bilinear:
+                auswahl = offen & im_umfang
+            else:
+                auswahl = offen & _pixel_im_dgm(src, x, y)[2]
+            ausserhalb &= ~im_umfang
+            if not auswahl.any():
+                continue
+            if bilinear:
+                hoehen[auswahl] = _hoehen_bilinear(src, x[auswahl], y[auswahl])
+            else:
+                hoehen[auswahl] = _hoehen_naechstes_pixel(src, x[auswahl], y[auswahl], umfang_pruefen=False)
+            offen[auswahl] = False
+    hoehen[ausserhalb] = np.nan
+    return hoehen, ausserhalb
+
+def datei_hash(pfad, hash_typ='sha-256', blockgroesse=1024 * 1024):
+    """Berechnet den Hash einer Datei blockweise."""
+    h = hashlib.new(HASH_TYPEN[hash_typ])
+    with open(pfad, 'rb') as f:
+        for block in iter(lambda: f.read(blockgroesse), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _bevorzugter_hash(hashes):
+    """Wählt den stärksten bekannten Hash aus den Angaben der meta4-Datei."""
+    for hash_typ in ('sha-512', 'sha-256', 'sha-1', 'md5'):
+        if hash_typ in hashes:
+            return hash_typ, hashes[hash_typ]
+    return None, None
+
+@contextmanager
+def _sperre(pfad):
+    """Exklusive Sperre über eine Sperrdatei mit der Dateisperre des Betriebssystems (fcntl bzw. msvcrt).
+
+    Die Sperre gehört dem Prozess, der die Datei geöffnet hat, und endet spätestens mit ihm; eine
+    verwaiste Sperre kann es daher nicht geben. Die Sperrdatei bleibt liegen (Löschen wäre nicht
+    sicher, solange ein anderer Prozess auf sie wartet).
+    """
+    with open(pfad, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK versucht es zehn Sekunden lang und meldet dann einen Fehler: weiter warten
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _index_sperre(cache_verzeichnis):
+    return _sperre(os.path.join(cache_verzeichnis, 'index.json.lock'))
+
+def _lade_index(cache_verzeichnis):
+    pfad = os.path.join(cache_verzeichnis, 'index.json')
+    if os.path.exists(pfad):
+        with open(pfad, encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def _speichere_index(cache_verzeichnis, index):
+    pfad = os.path.join(cache_verzeichnis, 'index.json')
+    with tempfile.NamedTemporaryFile('w', dir=cache_verzeichnis, delete=False, encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    os.replace(f.name, pfad)
+
+def _entferne_eintrag(cache_verzeichnis, index, schluessel):
+    """Entfernt eine Kachel aus Index und Cache; False, wenn die Datei gerade geöffnet ist (Windows)."""
+    pfad = os.path.join(cache_verzeichnis, index[schluessel]['datei'])
+    try:
+        if os.path.exists(pfad):
+            os.unlink(pfad)
+    except PermissionError:
+        return False
+    del index[schluessel]
+    return True
+
+def _teildateien_groesse(cache_verzeichnis):
+    """Größe der laufenden bzw. abgebrochenen Downloads (``.part``)."""
+    groesse = 0
+    for pfad in glob.glob(os.path.join(cache_verzeichnis, '*.part')):
+        try:
+            groesse += os.path.getsize(pfad)
+        except FileNotFoundError:
+            pass
+    return groesse
+
+def raeume_cache_auf(cache_verzeichnis=DGM_CACHE_VERZEICHNIS, max_bytes=DGM_CACHE_MAX_BYTES, behalten=(),
+                     schutzfrist=DGM_CACHE_SCHUTZFRIST):
+    """Entfernt die am längsten nicht genutzten Kacheln, bis die Größengrenze eingehalten ist.
+
+    Teildateien laufender Downloads zählen zur Größe. Kacheln aus ``behalten`` und Kacheln, die
+    innerhalb der ``schutzfrist`` (Sekunden) genutzt wurden, bleiben erhalten.
+    """
+    with _index_sperre(cache_verzeichnis):
+        index = _lade_index(cache_verzeichnis)
+        gesamt = sum(eintrag['groesse'] for eintrag in index.values()) + _teildateien_groesse(cache_verzeichnis)
+        geschuetzt_ab = time.time() - schutzfrist
+        for schluessel in sorted(index, key=lambda s: index[s]['zuletzt_genutzt']):
+            if gesamt <= max_bytes:
+                break
+            eintrag = index[schluessel]
+            if schluessel in behalten or eintrag['zuletzt_genutzt'] >= geschuetzt_ab:
+                continue
+            if _entferne_eintrag(cache_verzeichnis, index, schluessel):
+                gesamt -= eintrag['groesse']
+                print(f"DGM-Cache: entferne {eintrag['url']}")
+        _speichere_index(cache_verzeichnis, index)
+
+def _gueltiger_eintrag(cache_verzeichnis, index, schluessel, erwarteter_hash, vollstaendig_pruefen):
+    """Pfad der Kachel, falls der Eintrag zur Datei passt (und markiert sie als genutzt), sonst None."""
+    eintrag = index.get(schluessel)
+    if eintrag is None:
+        return None
+    pfad = os.path.join(cache_verzeichnis, eintrag['datei'])
+    gueltig = os.path.exists(pfad) and os.path.getsize(pfad) == eintrag['groesse']
+    if gueltig and erwarteter_hash and eintrag.get('hash') != erwarteter_hash:
+        gueltig = False
+    if gueltig and vollstaendig_pruefen and eintrag.get('hash'):
+        gueltig = datei_hash(pfad, eintrag['hash_typ']) == eintrag['hash']
+    if gueltig:
+        eintrag['zuletzt_genutzt'] = time.time()
+        _speichere_index(cache_verzeichnis, index)
+        return pfad
+    print(f"DGM-Cache-Eintrag ungültig, lade neu: {eintrag['url']}")
+    _entferne_eintrag(cache_verzeichnis, index, schluessel)
+    _speichere_index(cache_verzeichnis, index)
+    return None
+
+def hole_dgm(urls, hashes=None, groesse=None, cache_verzeichnis=DGM_CACHE_VERZEICHNIS,
+             max_bytes=DGM_CACHE_MAX_BYTES, vollstaendig_pruefen=False):
+    """Gibt den lokalen Pfad einer DGM-Kachel zurück und lädt sie nur bei Bedarf herunter.
+
+    ``urls`` ist eine URL oder eine Liste von Spiegelservern. Schlüssel ist der Hash aus
+    der meta4-Datei (falls vorhanden, wird beim Herunterladen geprüft) bzw. die erste URL.
+    Bei einem Treffer wird die Dateigröße geprüft, mit ``vollstaendig_pruefen`` auch der Hash.
+    Abgebrochene Downloads bleiben als ``.part`` im Cache und werden beim nächsten Aufruf fortgesetzt.
+    Mehrere Prozesse können gleichzeitig aufrufen: Indexänderungen sind gesperrt, und dieselbe
+    Kachel wird nur von einem Prozess heruntergeladen, die anderen warten darauf.
+    """
+    if isinstance(urls, str):
+        urls = [urls]
+    url = urls[0]
+    os.makedirs(cache_verzeichnis, exist_ok=True)
+    hash_typ, erwarteter_hash = _bevorzugter_hash(hashes or {})
+
+    # Inhaltsadressiert über den Hash der meta4-Datei, sonst über die URL
+    if erwarteter_hash:
+        schluessel = f"{HASH_TYPEN[hash_typ]}_{erwarteter_hash}"
+    else:
+        schluessel = hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    datei = f"{schluessel}.tif"
+    pfad = os.path.join(cache_verzeichnis, datei)
+    with _sperre(pfad + '.lock'):
+        # Nach dem Warten auf die Sperre kann ein anderer Prozess die Kachel bereits geladen haben
+        with _index_sperre(cache_verzeichnis):
+            treffer = _gueltiger_eintrag(cache_verzeichnis, _lade_index(cache_verzeichnis), schluessel,
+                                         erwarteter_hash, vollstaendig_pruefen)
+        if treffer is not None:
+            print(f"DGM aus dem Cache: {treffer}")
+            return treffer
+
+        url = download_mit_spiegeln(urls, pfad + '.part', groesse, hashes)
+        if erwarteter_hash:
+            tatsaechlicher_hash = erwarteter_hash
+        else:
+            hash_typ, tatsaechlicher_hash = 'sha-256', datei_hash(pfad + '.part')
+
+        with _index_sperre(cache_verzeichnis):
+            os.replace(pfad + '.part', pfad)
+            index = _lade_index(cache_verzeichnis)
+            index[schluessel] = {'url': url, 'datei': datei, 'groesse': os.path.getsize(pfad), 'hash_typ': hash_typ,
+                                 'hash': tatsaechlicher_hash, 'zuletzt_genutzt': time.time()}
+            _speichere_index(cache_verzeichnis, index)
+    raeume_cache_auf(cache_verzeichnis, max_bytes, behalten=(schluessel,))
+    return pfad
+
+def dgm_aus_meta4(meta4_file, **kwargs):
+    """Gibt den lokalen Pfad der (ersten) DGM-Kachel einer meta4-Datei aus dem Cache zurück."""
+    datei = lese_meta4(meta4_file)[0]
+    return hole_dgm(datei['urls'], datei['hashes'], datei['groesse'], **kwargs)
+
+def alle_dgm_aus_meta4(meta4_file, **kwargs):
+    """Lädt alle Dateien einer meta4-Datei in den Cache. Rückgabe: Dictionary Dateiname -> Pfad."""
+    pfade = {}
+    for datei in lese_meta4(meta4_file):
+        pfade[datei['name']] = hole_dgm(datei['urls'], datei['hashes'], datei['groesse'], **kwargs)
+    return pfade
+
+def main():
+    # Alle Kacheln der angegebenen meta4-Dateien herunterladen
+    for meta4_file in sys.argv[1:]:
+        for name, pfad in alle_dgm_aus_meta4(meta4_file).items():
+            print(f"{name}: {pfad}")
+
+if __name__ == "__main__":
+    main()
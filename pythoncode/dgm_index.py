@@ -0,0 +1,117 @@
+import glob
+import json
+import os
+import re
+import sys
+
+import numpy as np
+from dgm import hoehen_an_punkten, hole_dgm, lese_meta4
+
+# DGM1 Bayern: Kacheln zu 1 km x 1 km in EPSG:25832 mit 1 m Auflösung,
+# benannt nach der linken unteren Ecke in km (z. B. 686_5336.tif bzw. 32686_5336.tif)
+KACHELGROESSE = 1000
+AUFLOESUNG = 1.0
+KACHEL_MUSTER = re.compile(r'(?:^|[^0-9])(?:32)?(\d{3})_(\d{4})(?:[^0-9]|$)')
+
+# Download-Adresse einer Kachel im Open-Data-Angebot (für Indizes aus der Gitterdefinition)
+DGM1_URL_VORLAGE = os.environ.get('DGM1_URL_VORLAGE', 'https://download1.bayernwolke.de/a/dgm/dgm1/{ost}_{nord}.tif')
+
+INDEX_DATEI = 'data/dgm_kachelindex.json'
+
+def _schluessel_code(ost, nord):
+    """Ein ganzzahliger Code je Kachel für vektorisiertes Gruppieren."""
+    return np.asarray(ost, dtype=np.int64) * 10_000 + np.asarray(nord, dtype=np.int64)
+
+def kachel_schluessel(x, y, kachelgroesse=KACHELGROESSE):
+    """Kachel (Ost, Nord in Kachelgrößen) der Punkte, in der die Punkte liegen."""
+    return (np.floor(np.asarray(x, dtype=float) / kachelgroesse).astype(np.int64),
+            np.floor(np.asarray(y, dtype=float) / kachelgroesse).astype(np.int64))
+
+def pixel_kachel_schluessel(x, y, kachelgroesse=KACHELGROESSE, aufloesung=AUFLOESUNG):
+    """Kachel, in der das gerundete Pixel (wie in ``get_elevation_at_point``) der Punkte liegt."""
+    x_mitte = (np.round(np.asarray(x, dtype=float) / aufloesung) + 0.5) * aufloesung
+    y_mitte = (-np.round(-np.asarray(y, dtype=float) / aufloesung) - 0.5) * aufloesung
+    return kachel_schluessel(x_mitte, y_mitte, kachelgroesse)
+
+def baue_index(meta4_verzeichnis):
+    """Index {(Ost, Nord): Datei aus der meta4-Datei} aus allen meta4-Dateien eines Verzeichnisses."""
+    index = {}
+    for meta4_file in sorted(glob.glob(os.path.join(meta4_verzeichnis, '**', '*.meta4'), recursive=True)):
+        for datei in lese_meta4(meta4_file):
+            treffer = KACHEL_MUSTER.search(os.path.basename(datei['name']))
+            if treffer is None:
+                print(f"Kachelname nicht erkannt, übersprungen: {datei['name']} ({meta4_file})")
+                continue
+            index[(int(treffer.group(1)), int(treffer.group(2)))] = datei
+    return index
+
+def baue_index_aus_gitter(ost_von, ost_bis, nord_von, nord_bis, url_vorlage=DGM1_URL_VORLAGE):
+    """Index für alle Kacheln eines Gitters (Grenzen in km, einschließlich) ohne meta4-Dateien."""
+    index = {}
+    for ost in range(ost_von, ost_bis + 1):
+        for nord in range(nord_von, nord_bis + 1):
+            url = url_vorlage.format(ost=ost, nord=nord)
+            index[(ost, nord)] = {'name': f"{ost}_{nord}.tif", 'urls': [url], 'groesse': None, 'hashes': {}}
+    return index
+
+def speichere_index(index, pfad=INDEX_DATEI):
+    with open(pfad, 'w', encoding='utf-8') as f:
+        json.dump({f"{ost}_{nord}": datei for (ost, nord), datei in index.items()}, f, indent=2)
+
+def lade_index(pfad=INDEX_DATEI):
+    with open(pfad, encoding='utf-8') as f:
+        return {tuple(int(teil) for teil in schluessel.split('_')): datei for schluessel, datei in json.load(f).items()}
+
+def kacheln_fuer_punkte(index, x, y, bilinear=False):
+    """Ordnet die Punkte den Kacheln des Index zu.
+
+    Rückgabe: Dictionary (Ost, Nord) -> Indizes der Punkte und Maske der Punkte ohne Kachel im Index
+    """
+    ost, nord = kachel_schluessel(x, y) if bilinear else pixel_kachel_schluessel(x, y)
+    codes = _schluessel_code(ost, nord)
+    gruppen = {}
+    ohne_kachel = np.ones(codes.shape, dtype=bool)
+    eindeutig, gruppe = np.unique(codes, return_inverse=True)
+    reihenfolge = np.argsort(gruppe, kind='stable')
+    grenzen = np.r_[0, np.cumsum(np.bincount(gruppe, minlength=len(eindeutig)))]
+    for g, code in enumerate(eindeutig):
+        schluessel = (int(code // 10_000), int(code % 10_000))
+        if schluessel in index:
+            punkte = reihenfolge[grenzen[g]:grenzen[g + 1]]
+            gruppen[schluessel] = punkte
+            ohne_kachel[punkte] = False
+    return gruppen, ohne_kachel
+
+def hoehen_aus_index(index, x, y, bilinear=False, **cache_kwargs):
+    """Geländehöhen für beliebige Punkte (EPSG:25832) über den Kachelindex.
+
+    Benötigte Kacheln werden über den DGM-Cache geladen und je einmal gelesen. Bilinear wird
+    innerhalb eines halben Pixels an Kachelgrenzen der Randwert der eigenen Kachel verwendet.
+    Rückgabe: (Höhen, Maske der Punkte ohne Kachel im Index)
+    """
+    x, y = np.broadcast_arrays(np.atleast_1d(np.asarray(x, dtype=float)), np.atleast_1d(np.asarray(y, dtype=float)))
+    hoehen = np.full(x.shape, np.nan)
+    if not index:
+        # Leerer Index (z. B. keine passenden meta4-Dateien): kein Punkt hat eine Kachel
+        return hoehen, np.ones(x.shape, dtype=bool)
+    gruppen, _ = kacheln_fuer_punkte(index, x, y, bilinear)
+    for schluessel, punkte in gruppen.items():
+        datei = index[schluessel]
+        pfad = hole_dgm(datei['urls'], datei['hashes'], datei['groesse'], **cache_kwargs)
+        hoehen[punkte] = hoehen_an_punkten(pfad, x[punkte], y[punkte], bilinear, umfang_pruefen=bilinear)
+
+    # Punkte, die selbst in keiner Kachel liegen (auch wenn das gerundete Pixel in einer liegt)
+    ohne_kachel = ~np.isin(_schluessel_code(*kachel_schluessel(x, y)), _schluessel_code(*zip(*index)))
+    hoehen[ohne_kachel] = np.nan
+    return hoehen, ohne_kachel
+
+def main():
+    # Index aus einem Verzeichnis mit meta4-Dateien erstellen
+    meta4_verzeichnis = sys.argv[1] if len(sys.argv) > 1 else 'data/meta4'
+    pfad = sys.argv[2] if len(sys.argv) > 2 else INDEX_DATEI
+    index = baue_index(meta4_verzeichnis)
+    speichere_index(index, pfad)
+    print(f"{len(index)} DGM-Kacheln indiziert -> {pfad}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+def runde(zahlen, decimals):
+    """Rundet spaltenweise mit demselben Ergebnis wie Pythons ``round``."""
+    gerundet = zahlen.round(decimals)
+    # np.round rechnet mit dem skalierten Wert und kann daher nur bei Werten nahe einem Halbwert
+    # (z. B. 0.085, Abstand höchstens Rundungsfehler der Skalierung) und bei sehr großen Werten
+    # (skaliert nicht mehr exakt darstellbar) von round() abweichen; diese wenigen Werte einzeln runden
+    skaliert = zahlen.to_numpy(dtype=float) * 10.0 ** decimals
+    with np.errstate(invalid='ignore'):
+        nahe_halbwert = np.abs(np.abs(skaliert - np.trunc(skaliert)) - 0.5) <= np.abs(skaliert) * 2.0 ** -50
+        einzeln = nahe_halbwert | (np.abs(skaliert) >= 2.0 ** 52)
+    if einzeln.any():
+        gerundet[einzeln] = [round(float(wert), decimals) for wert in zahlen[einzeln]]
+    return gerundet
+
+def konvertiere_numerisch(werte, decimals=None):
+    """Wandelt eine Spalte mit deutschem Zahlenformat spaltenweise in float um.
+
+    Dezimalkomma und wissenschaftliche Schreibweise (z. B. ``4,97031E+15``) werden
+    unterstützt. Rückgabe: (umgewandelte Spalte, Maske der nicht lesbaren Werte)
+    """
+    if pd.api.types.is_bool_dtype(werte) or pd.api.types.is_numeric_dtype(werte):
+        zahlen = werte.astype(float)
+        fehlerhaft = pd.Series(False, index=werte.index)
+    else:
+        # Zahlen und Text gemeinsam als Text behandeln, Dezimalkomma durch Punkt ersetzen
+        text = werte.astype('string').str.strip().str.replace(',', '.', regex=False)
+        zahlen = pd.to_numeric(text, errors='coerce').astype(float)
+        # Leere Felder und der Text 'nan' (z. B. aus einem früheren Export) gelten als fehlend, nicht als fehlerhaft
+        fehlend = text.isna() | (text == '') | (text.str.lower() == 'nan')
+        fehlerhaft = (~fehlend & zahlen.isna()).fillna(False).astype(bool)
+
+    if decimals is not None:
+        zahlen = runde(zahlen, decimals)
+    return zahlen, fehlerhaft
+
+def konvertiere_numerische_spalten(df, spalten, decimals=None, melden=True):
+    """Wandelt die angegebenen Spalten von ``df`` direkt um und gibt einen Fehlerbericht je Spalte zurück.
+
+    Nicht vorhandene Spalten werden übersprungen. Mit ``melden=True`` werden Spalten
+    mit nicht lesbaren Werten ausgegeben.
+    """
+    bericht = []
+    for col in spalten:
+        if col not in df.columns:
+            continue
+        zahlen, fehlerhaft = konvertiere_numerisch(df[col], decimals)
+        beispiel = df[col][fehlerhaft].iloc[0] if fehlerhaft.any() else None
+        df[col] = zahlen
+        bericht.append({'Spalte': col, 'Werte': len(fehlerhaft), 'Fehlerhaft': int(fehlerhaft.sum()), 'Beispiel': beispiel})
+
+    bericht = pd.DataFrame(bericht, columns=['Spalte', 'Werte', 'Fehlerhaft', 'Beispiel']).set_index('Spalte')
+    if melden and bericht['Fehlerhaft'].any():
+        print("Warnung: Nicht lesbare Zahlenwerte (als NaN übernommen):")
+        print(bericht[bericht['Fehlerhaft'] > 0].to_string())
+    return bericht
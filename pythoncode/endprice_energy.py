@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt 
 import numpy as np
+from abbildungen import abbildung, erstelle_abbildungen
 
 # Daten
 jahre = [2020, 2025, 2030, 2035, 2040, 2045, 2050]
@@ -57,24 +58,31 @@ for szenario in endpreise.keys():
 
 #print(endpreise)
 # Diagramm erstellen
-plt.figure(figsize=(10, 6))
-plt.plot(jahre, endpreise['current_policies'], label='Current policies', color='blue', linewidth=2)
-plt.plot(jahre, endpreise['below_2'], label='2 Degrees', color='red', linestyle='--', linewidth=2)
-plt.plot(jahre, endpreise['disorderly'], label='Disorderly', color='black', linestyle='-.', linewidth=2)
-plt.plot(jahre, endpreise['net_zero'], label='Net Zero', color='blue', linestyle=':', linewidth=2)
+def diagramm_endpreise(jahre, endpreise):
+    fig = plt.figure(figsize=(10, 6))
+    plt.plot(jahre, endpreise['current_policies'], label='Current policies', color='blue', linewidth=2)
+    plt.plot(jahre, endpreise['below_2'], label='2 Degrees', color='red', linestyle='--', linewidth=2)
+    plt.plot(jahre, endpreise['disorderly'], label='Disorderly', color='black', linestyle='-.', linewidth=2)
+    plt.plot(jahre, endpreise['net_zero'], label='Net Zero', color='blue', linestyle=':', linewidth=2)
 
-# Xóa tiêu đề biểu đồ, điều chỉnh kích thước phông chữ và thêm lưới
-plt.xlabel('Jahr', fontsize=12)
-plt.ylabel('Euro/kWh', fontsize=12)
-plt.legend(fontsize=12)
-plt.grid(True, linestyle=':', alpha=0.7)
-plt.ylim(0, max(max(preise) for preise in endpreise.values()) * 1.1)  # Anpassung der y-Achse
+    # Xóa tiêu đề biểu đồ, điều chỉnh kích thước phông chữ và thêm lưới
+    plt.xlabel('Jahr', fontsize=12)
+    plt.ylabel('Euro/kWh', fontsize=12)
+    plt.legend(fontsize=12)
+    plt.grid(True, linestyle=':', alpha=0.7)
+    plt.ylim(0, max(max(preise) for preise in endpreise.values()) * 1.1)  # Anpassung der y-Achse
 
-# Điều chỉnh phông chữ cho các giá trị trên trục
-plt.xticks(fontsize=12)
-plt.yticks(fontsize=12)
+    # Điều chỉnh phông chữ cho các giá trị trên trục
+    plt.xticks(fontsize=12)
+    plt.yticks(fontsize=12)
+    return fig
 
-plt.show()
+def abbildungen():
+    return [abbildung('figures/endenergiepreis.png', diagramm_endpreise, jahre=jahre, endpreise=endpreise)]
+
+def main():
+    # Diagramm erstellen (nur bei geänderten Preisen, siehe abbildungen.py)
+    erstelle_abbildungen(abbildungen())
 
 # # Werte ausgeben
 # szenarien = ['Current policies', '2 Degrees', 'Disorderly', 'Net Zero']
@@ -82,3 +90,6 @@ plt.show()
 #     print(f"\n{szenarien[i]}:")
 #     for j, jahr in enumerate(jahre):
 #         print(f"{jahr}: {endpreise[szenario][j]:.3f}")
+
+if __name__ == "__main__":
+    main()
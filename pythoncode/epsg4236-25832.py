@@ -1,11 +1,8 @@
-from pyproj import Transformer
+from koordinaten import wgs84_nach_utm32
 
 def convert_coordinates(latitude, longitude):
-    # Initialisierung des Transformers von EPSG:4326 (WGS 84) zu EPSG:25832 (UTM Zone 32N)
-    transformer = Transformer.from_crs("EPSG:4326", "EPSG:25832", always_xy=True)
-    
-    # Koordinatenumwandlung
-    easting, northing = transformer.transform(longitude, latitude)
+    # Koordinatenumwandlung von EPSG:4326 (WGS 84) zu EPSG:25832 (UTM Zone 32N), Transformer gecacht
+    easting, northing = wgs84_nach_utm32(latitude, longitude)
     
     return easting, northing
 
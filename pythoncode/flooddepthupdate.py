@@ -1,43 +1,15 @@
-import xml.etree.ElementTree as ET
-import requests
 import rasterio
 import numpy as np
-from pyproj import Transformer, CRS
-import tempfile
-import os
 import math
+from dgm import dgm_aus_meta4, fenster_um_punkt, load_dgm
+from koordinaten import transformer, transformiere
 
-def get_dgm_url_from_meta4(meta4_file):
-    tree = ET.parse(meta4_file)
-    root = tree.getroot()
-    namespace = {'metalink': 'urn:ietf:params:xml:ns:metalink'}
-    url = root.find('.//metalink:url', namespace).text
-    return url
-
-def download_dgm(url):
-    response = requests.get(url)
-    if response.status_code == 200:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.tif') as tmp_file:
-            tmp_file.write(response.content)
-            return tmp_file.name
-    else:
-        raise Exception(f"DGM-Datei konnte nicht heruntergeladen werden. HTTP-Statuscode: {response.status_code}")
-
-def load_dgm(file_path):
-    with rasterio.open(file_path) as src:
-        elevation = src.read(1)
-        transform = src.transform
-        crs = src.crs
-        bounds = src.bounds
-        print(f"DGM-Bereich (Bounding Box): {bounds}")
-    return elevation, transform, crs, bounds
-
-def get_elevation_at_point(x, y, elevation, transform, src_crs, dst_crs, bounds):
+def get_elevation_at_point(x, y, elevation, transform, src_crs, dst_crs, bounds, fenster=None):
+    # Mit ``fenster`` ist ``elevation`` nur dieser Ausschnitt; ``transform`` und ``bounds`` gelten für das gesamte DGM
     try:
         # Koordinaten umwandeln, falls erforderlich
         if src_crs != dst_crs:
-            transformer = Transformer.from_crs(src_crs, dst_crs, always_xy=True)
-            x, y = transformer.transform(x, y)
+            x, y = transformer(src_crs, dst_crs).transform(x, y)
         print(f"Verwendete Koordinaten: x={x}, y={y}")
         
         # Prüfen, ob die Koordinaten innerhalb des DGM-Bereichs liegen
@@ -52,6 +24,9 @@ def get_elevation_at_point(x, y, elevation, transform, src_crs, dst_crs, bounds)
         
         # Pixel-Indizes runden
         row, col = int(round(row)), int(round(col))
+        if fenster is not None:
+            # Im gesamten DGM runden und erst dann in den Ausschnitt verschieben (wie ``dgm.pixel_index``)
+            row, col = row - fenster.row_off, col - fenster.col_off
         print(f"Pixel-Indizes: row={row}, col={col}")
         
         # Prüfen, ob die Pixel-Indizes innerhalb des Höhenarray-Bereichs liegen
@@ -74,14 +49,12 @@ def calculate_flood_depth(ground_elevation, water_level):
 
 def convert_coordinates(latitude, longitude, from_epsg=4326, to_epsg=25832):
     """Konvertiert Koordinaten von WGS 84 (EPSG:4326) zu UTM32 (EPSG:25832)"""
-    transformer = Transformer.from_crs(f"EPSG:{from_epsg}", f"EPSG:{to_epsg}", always_xy=True)
-    easting, northing = transformer.transform(longitude, latitude)
+    easting, northing = transformiere(longitude, latitude, from_epsg, to_epsg)
     return easting, northing
 
 def reverse_convert_coordinates(easting, northing, from_epsg=25832, to_epsg=4326):
     """Konvertiert Koordinaten von UTM32 (EPSG:25832) zu WGS 84 (EPSG:4326)"""
-    transformer = Transformer.from_crs(f"EPSG:{from_epsg}", f"EPSG:{to_epsg}", always_xy=True)
-    longitude, latitude = transformer.transform(easting, northing)
+    longitude, latitude = transformiere(easting, northing, from_epsg, to_epsg)
     return latitude, longitude
 
 def main(input_string):
@@ -100,14 +73,15 @@ def main(input_string):
         
         # DGM-Verarbeitung
         meta4_file = r"C:\Users\uyen truong\Downloads\landshut.meta4"
-        dgm_url = get_dgm_url_from_meta4(meta4_file)
-        print(f"DGM-URL: {dgm_url}")
+        dgm_file = dgm_aus_meta4(meta4_file)
+        print(f"DGM-Datei (Cache): {dgm_file}")
         
-        dgm_file = download_dgm(dgm_url)
-        print(f"DGM wurde heruntergeladen nach: {dgm_file}")
-        
-        elevation, transform, dgm_crs, bounds = load_dgm(dgm_file)
-        print(f"DGM wurde geladen. Größe: {elevation.shape}")
+        # Nur die Pixel um den Punkt lesen statt des gesamten DGM
+        fenster = fenster_um_punkt(dgm_file, x, y)
+        elevation, _, dgm_crs, _ = load_dgm(dgm_file, fenster)
+        with rasterio.open(dgm_file) as src:
+            transform, bounds = src.transform, src.bounds
+        print(f"DGM-Ausschnitt wurde geladen. Größe: {elevation.shape}")
         print(f"DGM-Koordinatensystem: {dgm_crs}")
         print(f"DGM-Bereich: {bounds}")
         
@@ -118,7 +92,7 @@ def main(input_string):
         # Berechnung des absoluten Wasserstands
         absolute_water_level = calculate_absolute_water_level(pegelstand_cm, pegelnullpunkt_m)
         
-        point_elevation = get_elevation_at_point(x, y, elevation, transform, dgm_crs, dgm_crs, bounds)
+        point_elevation = get_elevation_at_point(x, y, elevation, transform, dgm_crs, dgm_crs, bounds, fenster)
         
         if point_elevation is not None:
             flood_depth = calculate_flood_depth(point_elevation, absolute_water_level)
@@ -132,12 +106,6 @@ def main(input_string):
     
     except Exception as e:
         print(f"Ein Fehler ist in main aufgetreten: {str(e)}")
-    
-    finally:
-        # Temporäre Datei nach Gebrauch löschen
-        if 'dgm_file' in locals():
-            os.unlink(dgm_file)
-            print("Temporäre Datei wurde gelöscht")
 
 if __name__ == "__main__":
     input_string = "latitude;longitude;48.58722639452854,12.271763451420263"
@@ -0,0 +1,103 @@
+import os
+from zipfile import ZipFile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from koordinaten import LAEA
+from zwischenspeicher import ist_aktuell, schreibe_geoparquet
+
+# Hochwasserereignisse (Überschwemmungsflächen, Shapefile im ZIP, EPSG:4258) und vorbereitete Datei in EPSG:3035
+HOCHWASSER_ZIP = os.environ.get('HOCHWASSER_ZIP', 'data/hochwasserereignisse_epsg4258_shp.zip')
+HOCHWASSER_3035 = 'data/hochwasserereignisse_epsg3035.parquet'
+
+# Hochwasserrisiko nach Wiederkehrintervall der Überflutungsfläche (GEB_HQ)
+HQ_RISIKO = {
+    'HQ 20': 'high', 'HQ 30': 'high',
+    'HQ 40': 'medium', 'HQ 50': 'medium', 'HQ 80': 'medium',
+    'HQ 100': 'low', 'HQ 200': 'low'
+}
+STANDARD_RISIKO = 'very low'
+
+def hq_jahre(geb_hq):
+    """Wiederkehrintervall in Jahren aus GEB_HQ ('HQ 100' -> 100, 'HQ extrem' -> inf, fehlend -> NaN)."""
+    text = pd.Series(geb_hq, dtype='string')
+    jahre = pd.to_numeric(text.str.extract(r'(\d+)', expand=False), errors='coerce').astype(float)
+    jahre[text.notna() & jahre.isna()] = np.inf
+    return jahre
+
+def bestimme_hochwasserrisiko(geb_hq):
+    """Ordnet GEB_HQ-Werte spaltenweise dem Hochwasserrisiko zu (high, medium, low, very low)."""
+    return pd.Series(geb_hq).map(HQ_RISIKO).fillna(STANDARD_RISIKO)
+
+def weise_hq_zu(punkte, flaechen, spalte='GEB_HQ'):
+    """Weist allen Punkten in einem räumlichen Join (STRtree) den GEB_HQ-Wert ihrer Hochwasserfläche zu.
+
+    Liegt ein Punkt in mehreren Flächen, gilt die mit dem kürzesten Wiederkehrintervall (häufigstes
+    Hochwasser), danach 'HQ extrem', dann Flächen ohne Angabe; bei Gleichstand die erste Fläche.
+    Rückgabe: Series mit dem Index von ``punkte`` (None außerhalb aller Flächen)
+    """
+    if flaechen.crs != punkte.crs:
+        flaechen = flaechen.to_crs(punkte.crs)
+    treffer = gpd.sjoin(punkte[['geometry']].reset_index(drop=True), flaechen[[spalte, 'geometry']].reset_index(drop=True),
+                        how='inner', predicate='within')
+    treffer = treffer.rename_axis('_punkt').reset_index()
+    treffer['_jahre'] = hq_jahre(treffer[spalte]).to_numpy()
+    treffer = treffer.sort_values(['_punkt', '_jahre', 'index_right'], na_position='last', kind='stable')
+    treffer = treffer.drop_duplicates('_punkt').set_index('_punkt')[spalte]
+
+    # Objekt-Array mit echten None-Werten (pd.Series(None, dtype=object) ergibt unter pandas 3 NaN)
+    werte = np.full(len(punkte), None, dtype=object)
+    werte[treffer.index.to_numpy()] = [None if pd.isna(wert) else wert for wert in treffer]
+    return pd.Series(werte, index=punkte.index, dtype=object)
+
+def shapefile_im_zip(zip_pfad):
+    """Pfad der (ersten) Shapefile-Datei innerhalb der ZIP-Datei, ohne zu entpacken."""
+    with ZipFile(zip_pfad, 'r') as zip_ref:
+        shp_files = sorted(name for name in zip_ref.namelist() if name.lower().endswith('.shp'))
+    if not shp_files:
+        raise FileNotFoundError("Keine .shp-Datei in der ZIP gefunden")
+    return f"zip://{zip_pfad}!{shp_files[0]}"
+
+def lese_hochwasserereignisse(zip_pfad=HOCHWASSER_ZIP, crs=LAEA):
+    """Liest die Hochwasserflächen direkt aus der ZIP-Datei, transformiert sie und repariert ungültige Geometrien."""
+    flaechen = gpd.read_file(shapefile_im_zip(zip_pfad))
+    if crs is not None:
+        flaechen = flaechen.to_crs(crs)
+    ungueltig = ~flaechen.is_valid
+    if ungueltig.any():
+        flaechen.loc[ungueltig, 'geometry'] = flaechen.geometry[ungueltig].make_valid()
+    return flaechen[flaechen.geometry.notna() & ~flaechen.geometry.is_empty].reset_index(drop=True)
+
+def hochwasser_dateien(zip_pfad=HOCHWASSER_ZIP, ziel=HOCHWASSER_3035):
+    """Datei, aus der ``lade_hochwasserereignisse`` die Daten bezieht (ZIP-Datei bzw. vorbereitete Datei)."""
+    return [zip_pfad] if os.path.exists(zip_pfad) else [ziel]
+
+def lade_hochwasserereignisse(zip_pfad=HOCHWASSER_ZIP, ziel=HOCHWASSER_3035):
+    """Hochwasserflächen in EPSG:3035 aus der vorbereiteten Datei; neu erstellt, wenn sich die ZIP-Datei geändert hat."""
+    quellen = {'hochwasser_zip': zip_pfad}
+    if not os.path.exists(zip_pfad):
+        if not os.path.exists(ziel):
+            raise FileNotFoundError(f"Weder {zip_pfad} noch {ziel} gefunden")
+        print(f"{zip_pfad} nicht gefunden, verwende vorhandene Datei {ziel}")
+    elif not ist_aktuell(ziel, quellen):
+        flaechen = lese_hochwasserereignisse(zip_pfad)
+        schreibe_geoparquet(flaechen, ziel, quellen)
+        print(f"Hochwasserflächen erstellt: {ziel} ({len(flaechen)} Flächen)")
+        return flaechen
+    return gpd.read_parquet(ziel)
+
+def main():
+    # Kurze Prüfung der Zuordnung: Punkte außerhalb aller Flächen erhalten None
+    from shapely.geometry import Point, box
+    flaechen = gpd.GeoDataFrame({'GEB_HQ': ['HQ 100', 'HQ 20', None]},
+                                geometry=[box(0, 0, 10, 10), box(5, 5, 10, 10), box(20, 0, 30, 10)], crs=LAEA)
+    punkte = gpd.GeoDataFrame(geometry=[Point(1, 1), Point(6, 6), Point(50, 50), Point(25, 5)],
+                              index=[10, 11, 12, 13], crs=LAEA)
+    werte = weise_hq_zu(punkte, flaechen)
+    assert werte.tolist() == ['HQ 100', 'HQ 20', None, None], werte.tolist()
+    assert werte[12] is None and werte[13] is None and list(werte.index) == [10, 11, 12, 13]
+    print("Hochwasserzuordnung: alle Prüfungen bestanden")
+
+if __name__ == "__main__":
+    main()
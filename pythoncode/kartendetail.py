@@ -0,0 +1,104 @@
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from hochwasserzonen import HOCHWASSER_3035
+from plz_bayern import PLZ_BAYERN
+from zwischenspeicher import ist_aktuell, schreibe_geoparquet
+
+# Vereinfachungstoleranzen der Detailstufen in Metern (EPSG:3035)
+TOLERANZEN = (10, 50, 200, 1000)
+DETAIL_VERZEICHNIS = 'data/detailstufen'
+
+# Vorbereitete Ebenen: Name -> (Quelldatei, Flächendeckung mit gemeinsamen Grenzen)
+EBENEN = {
+    'plz_bayern': (PLZ_BAYERN, True),
+    'hochwasserereignisse': (HOCHWASSER_3035, False),
+}
+
+def vereinfache(geometrien, toleranz, abdeckung=False):
+    """Vereinfacht Geometrien topologieerhaltend.
+
+    Bei einer Flächendeckung (``abdeckung``, z. B. PLZ-Gebiete) werden gemeinsame Grenzen mit
+    ``shapely.coverage_simplify`` nur einmal vereinfacht, sodass keine Lücken oder Überlappungen
+    entstehen. Doppelte Geometrien werden dafür zusammengefasst. Ohne shapely >= 2.1 oder bei
+    ungültiger Abdeckung wird jede Geometrie einzeln vereinfacht.
+    """
+    geometrien = np.asarray(geometrien, dtype=object)
+    if abdeckung and hasattr(shapely, 'coverage_simplify'):
+        _, erste, zuordnung = np.unique(shapely.to_wkb(geometrien), return_index=True, return_inverse=True)
+        eindeutig = geometrien[erste]
+        if shapely.coverage_is_valid(eindeutig):
+            return shapely.coverage_simplify(eindeutig, toleranz)[zuordnung.ravel()]
+    return shapely.simplify(geometrien, toleranz, preserve_topology=True)
+
+def detailstufe_pfad(name, toleranz, verzeichnis=DETAIL_VERZEICHNIS):
+    return os.path.join(verzeichnis, f"{name}_{toleranz}m.parquet")
+
+def detailstufe_aktuell(name, toleranz, verzeichnis=DETAIL_VERZEICHNIS):
+    """Prüft, ob die Detailstufe existiert und aus der aktuellen Quelldatei der Ebene erstellt wurde."""
+    return ist_aktuell(detailstufe_pfad(name, toleranz, verzeichnis), {'quelle': EBENEN[name][0]})
+
+def erstelle_detailstufen(name, toleranzen=TOLERANZEN, verzeichnis=DETAIL_VERZEICHNIS):
+    """Erstellt die vereinfachten Geometrien einer Ebene für alle Toleranzen (nur wenn die Quelle sich geändert hat).
+
+    Jede Stufe wird aus der nächstfeineren berechnet; die Abweichung zur Quelle bleibt dadurch
+    unter der Summe der Toleranzen bis zu dieser Stufe. Vorverarbeitungsschritt ohne Sperre:
+    nicht aus mehreren Prozessen gleichzeitig aufrufen (``python pythoncode/kartendetail.py``).
+    """
+    quelle, abdeckung = EBENEN[name]
+    quellen = {'quelle': quelle}
+    if all(detailstufe_aktuell(name, toleranz, verzeichnis) for toleranz in toleranzen):
+        return
+    original = gpd.read_parquet(quelle, columns=['geometry']).geometry
+    n_original = shapely.get_num_coordinates(original.values).sum()
+    geometrien = original.values
+    for toleranz in sorted(toleranzen):
+        geometrien = vereinfache(geometrien, toleranz, abdeckung)
+        schreibe_geoparquet(gpd.GeoDataFrame(geometry=geometrien, crs=original.crs),
+                            detailstufe_pfad(name, toleranz, verzeichnis), quellen)
+        anteil = shapely.get_num_coordinates(geometrien).sum() / n_original
+        print(f"Detailstufe {name} {toleranz} m: {anteil:.1%} der Stützpunkte")
+
+def passende_toleranz(grenzen, breite_px, hoehe_px, toleranzen=TOLERANZEN):
+    """Größte Toleranz, die höchstens einem halben Pixel entspricht (None: volle Auflösung)."""
+    minx, miny, maxx, maxy = grenzen
+    meter_pro_pixel = max((maxx - minx) / breite_px, (maxy - miny) / hoehe_px)
+    passend = [toleranz for toleranz in toleranzen if toleranz <= meter_pro_pixel / 2]
+    return max(passend) if passend else None
+
+def karten_geometrie(gdf, name, ax, dpi=None, toleranzen=TOLERANZEN, verzeichnis=DETAIL_VERZEICHNIS):
+    """Geometrien von ``gdf`` in der Detailstufe, die zur Größe der Achse ``ax`` passt.
+
+    ``gdf`` muss die vorbereitete Ebene ``name`` in unveränderter Zeilenfolge sein (z. B. aus
+    ``lade_plz_bayern``); sonst oder bei sehr großem Maßstab bleibt die volle Auflösung.
+    Es werden nur vorhandene, aktuelle Detailstufen gelesen (erstellt mit ``erstelle_detailstufen``
+    bzw. ``python pythoncode/kartendetail.py``), sonst bleibt ebenfalls die volle Auflösung.
+    ``dpi``: Auflösung der Ausgabe, Standard ist die Auflösung der Abbildung.
+    Rückgabe: GeoSeries mit dem Index von ``gdf``
+    """
+    breite_zoll, hoehe_zoll = ax.get_position().size * ax.figure.get_size_inches()
+    dpi = dpi or ax.figure.dpi
+    toleranz = passende_toleranz(gdf.total_bounds, breite_zoll * dpi, hoehe_zoll * dpi, toleranzen)
+    if toleranz is None or not os.path.exists(EBENEN[name][0]):
+        return gdf.geometry
+    if not detailstufe_aktuell(name, toleranz, verzeichnis):
+        print(f"Detailstufe {name} {toleranz} m fehlt oder ist veraltet, volle Auflösung "
+              f"(erstellen mit python pythoncode/kartendetail.py)")
+        return gdf.geometry
+
+    vereinfacht = gpd.read_parquet(detailstufe_pfad(name, toleranz, verzeichnis)).geometry
+    if len(vereinfacht) != len(gdf) or vereinfacht.crs != gdf.crs:
+        return gdf.geometry
+    vereinfacht.index = gdf.index
+    return vereinfacht
+
+def main():
+    # Detailstufen aller (oder der angegebenen) Ebenen erstellen
+    for name in sys.argv[1:] or EBENEN:
+        erstelle_detailstufen(name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from pyproj import Transformer
+
+# Im Projekt verwendete Koordinatensysteme
+WGS84 = 'EPSG:4326'
+ETRS89 = 'EPSG:4258'
+UTM32 = 'EPSG:25832'
+LAEA = 'EPSG:3035'
+
+# Ab dieser Anzahl Punkte wird die Umrechnung auf mehrere Threads verteilt
+PARALLEL_AB = 1_000_000
+
+# Transformer je Thread und Koordinatensystempaar (pyproj-Objekte nicht zwischen Threads teilen)
+_lokal = threading.local()
+
+def _crs_schluessel(crs):
+    """Einheitliche Darstellung eines Koordinatensystems (EPSG-Nummer, Text oder CRS-Objekt)."""
+    if isinstance(crs, (int, np.integer)):
+        return f"EPSG:{crs}"
+    if hasattr(crs, 'to_wkt'):
+        return crs.to_wkt()
+    return str(crs)
+
+def transformer(von, nach):
+    """Gibt einen (gecachten) Transformer mit Achsenreihenfolge x/Länge, y/Breite zurück."""
+    cache = getattr(_lokal, 'transformer', None)
+    if cache is None:
+        cache = _lokal.transformer = {}
+    schluessel = (_crs_schluessel(von), _crs_schluessel(nach))
+    if schluessel not in cache:
+        cache[schluessel] = Transformer.from_crs(*schluessel, always_xy=True)
+    return cache[schluessel]
+
+def transformiere(x, y, von, nach, n_threads=None, parallel_ab=PARALLEL_AB):
+    """Rechnet Koordinaten (Skalare oder Arrays, x/Länge vor y/Breite) von ``von`` nach ``nach`` um.
+
+    Große Arrays (ab ``parallel_ab`` Punkten) werden in Abschnitten auf ``n_threads`` Threads verteilt.
+    """
+    if np.ndim(x) == 0 and np.ndim(y) == 0:
+        return transformer(von, nach).transform(x, y)
+
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    n_threads = n_threads or os.cpu_count()
+    if x.size < parallel_ab or n_threads == 1:
+        return transformer(von, nach).transform(x, y)
+
+    x_flach, y_flach = x.ravel(), y.ravel()
+    x_neu, y_neu = np.empty(x.size), np.empty(x.size)
+    grenzen = np.linspace(0, x.size, n_threads + 1, dtype=int)
+
+    def _abschnitt(i):
+        teil = slice(grenzen[i], grenzen[i + 1])
+        x_neu[teil], y_neu[teil] = transformer(von, nach).transform(x_flach[teil], y_flach[teil])
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        list(pool.map(_abschnitt, range(n_threads)))
+    return x_neu.reshape(x.shape), y_neu.reshape(x.shape)
+
+def wgs84_nach_utm32(latitude, longitude, **kwargs):
+    """WGS 84 (EPSG:4326) -> UTM32 (EPSG:25832). Rückgabe: (easting, northing)"""
+    return transformiere(longitude, latitude, WGS84, UTM32, **kwargs)
+
+def utm32_nach_wgs84(easting, northing, **kwargs):
+    """UTM32 (EPSG:25832) -> WGS 84 (EPSG:4326). Rückgabe: (latitude, longitude)"""
+    longitude, latitude = transformiere(easting, northing, UTM32, WGS84, **kwargs)
+    return latitude, longitude
@@ -0,0 +1,127 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from einlesen import konvertiere_numerische_spalten
+from portfolio_store import lade_portfolio
+from risikogewicht import STANDARD_REGELWERK, risikogewichte
+
+# Höchstzahl gleichzeitig gehaltener Zufallswerte (Pfade x Darlehen) je Block
+MAX_ELEMENTE = 2_000_000
+
+# Portfoliodaten im Worker-Prozess (werden einmalig über den Initializer gesetzt)
+_portfolio = {}
+
+def _init_worker(portfolio):
+    _portfolio.update(portfolio)
+
+def _simuliere_pfadblock(n_pfade, seed_sequence):
+    """Simuliert einen Block von Pfaden und gibt Verlust und RWA je Pfad zurück."""
+    rng = np.random.default_rng(seed_sequence)
+    werte = _portfolio['werte']
+    schaden = _portfolio['schaden']
+    aep = _portfolio['aep']
+    darlehen = _portfolio['darlehen']
+    alt_RWA = _portfolio['alt_RWA']
+    T = _portfolio['T']
+    regelwerk = _portfolio['regelwerk']
+
+    verluste = np.zeros(n_pfade)
+    rwa_aenderung = np.zeros(n_pfade)
+
+    # Darlehen in Blöcken, damit (Pfade x Darlehen) die Speichergrenze nicht überschreitet
+    darlehen_je_block = max(1, MAX_ELEMENTE // n_pfade)
+    for start in range(0, len(werte), darlehen_je_block):
+        teil = slice(start, start + darlehen_je_block)
+
+        # Anzahl der Hochwasserereignisse je Pfad und Darlehen über den Horizont T
+        ereignisse = rng.binomial(T, aep[teil], size=(n_pfade, len(aep[teil])))
+        verlust = np.minimum(ereignisse * schaden[teil], werte[teil])
+
+        # Neue LtV und neues RWA nur für die betroffenen Darlehen
+        neuer_wert = werte[teil] - verlust
+        with np.errstate(divide='ignore', invalid='ignore'):
+            neue_LtV = np.where(neuer_wert > 0, darlehen[teil] / neuer_wert, np.inf)
+        neue_RWA = darlehen[teil] * risikogewichte(neue_LtV, regelwerk)
+        neue_RWA = np.where(ereignisse > 0, neue_RWA, alt_RWA[teil])
+
+        verluste += verlust.sum(axis=1)
+        rwa_aenderung += (neue_RWA - alt_RWA[teil]).sum(axis=1)
+
+    return verluste, rwa_aenderung
+
+def verlustkennzahlen(werte, konfidenz=0.99):
+    """Berechnet Mittelwert, Value at Risk und Expected Shortfall einer Verteilung."""
+    werte = np.asarray(werte, dtype=float)
+    var = np.quantile(werte, konfidenz)
+    return {
+        'Mittelwert': werte.mean(),
+        f'VaR {konfidenz:.1%}': var,
+        f'ES {konfidenz:.1%}': werte[werte >= var].mean()
+    }
+
+def simuliere_flutverluste(df, n_pfade=10_000, T=20, konfidenz=0.99, seed=42, pfade_je_block=1_000,
+                           n_prozesse=None, regelwerk=STANDARD_REGELWERK):
+    """Monte-Carlo-Simulation der Hochwasserverluste über den Horizont T.
+
+    Je Pfad und Darlehen wird die Anzahl der Hochwasser aus ``AEP`` gezogen (Binomial(T, AEP)),
+    der Schaden über ``Schadensfaktor`` angesetzt und LtV sowie RWA neu berechnet.
+    Die Pfade werden in Blöcken auf einen Prozesspool verteilt; jeder Block erhält einen
+    eigenen Zufallsstrom, daher ist das Ergebnis unabhängig von ``n_prozesse``.
+    Unter Windows muss der Aufruf in einem ``if __name__ == "__main__":``-Block stehen.
+
+    Rückgabe: (DataFrame mit Verlust und RWA-Änderung je Pfad, DataFrame mit Kennzahlen)
+    """
+    if n_pfade < 1 or pfade_je_block < 1:
+        raise ValueError(f"Es wird mindestens ein Pfad je Simulation und Block erwartet "
+                         f"(n_pfade={n_pfade}, pfade_je_block={pfade_je_block}).")
+    werte = df['aktueller_immobilienwert'].to_numpy(dtype=float)
+    schadenfaktor = df['Schadensfaktor'].to_numpy(dtype=float)
+    aep = df['AEP'].to_numpy(dtype=float)
+    darlehen = df['darlehenbetrag'].to_numpy(dtype=float)
+
+    # Nur Darlehen mit Hochwasserwahrscheinlichkeit und Schaden können sich verändern
+    betroffen = (aep > 0) & (schadenfaktor > 0) & np.isfinite(werte) & np.isfinite(darlehen)
+    portfolio = {
+        'werte': werte[betroffen],
+        'schaden': werte[betroffen] * schadenfaktor[betroffen],
+        'aep': np.clip(aep[betroffen], 0, 1),
+        'darlehen': darlehen[betroffen],
+        'alt_RWA': darlehen[betroffen] * df['Risikogewicht'].to_numpy(dtype=float)[betroffen],
+        'T': T,
+        'regelwerk': regelwerk
+    }
+
+    bloecke = [min(pfade_je_block, n_pfade - start) for start in range(0, n_pfade, pfade_je_block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(bloecke))
+
+    if n_prozesse == 1:
+        _init_worker(portfolio)
+        ergebnisse = [_simuliere_pfadblock(n, s) for n, s in zip(bloecke, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_prozesse or os.cpu_count(),
+                                 initializer=_init_worker, initargs=(portfolio,)) as pool:
+            ergebnisse = list(pool.map(_simuliere_pfadblock, bloecke, seeds))
+
+    pfade = pd.DataFrame({
+        'Verlust': np.concatenate([verluste for verluste, _ in ergebnisse]),
+        'RWA Änderung': np.concatenate([rwa for _, rwa in ergebnisse])
+    })
+    kennzahlen = pd.DataFrame({spalte: verlustkennzahlen(pfade[spalte], konfidenz) for spalte in pfade.columns}).T
+    return pfade, kennzahlen
+
+def main():
+    df = lade_portfolio('data/hypothekendaten_final_with_statistics.csv')
+
+    # Umwandlung der Spalten in numerische Werte
+    numeric_columns = ['aktueller_immobilienwert', 'Schadensfaktor', 'AEP', 'darlehenbetrag', 'Risikogewicht']
+    konvertiere_numerische_spalten(df, numeric_columns)
+
+    pfade, kennzahlen = simuliere_flutverluste(df)
+    print(f"Simulierte Pfade: {len(pfade)}")
+    print(f"Gesamtes RWA vor Hochwasser: {(df['darlehenbetrag'] * df['Risikogewicht']).sum():,.2f} €")
+    print(kennzahlen.round(2).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -1,84 +1,26 @@
 import pandas as pd
 import numpy as np
 from tabulate import tabulate
+from einlesen import konvertiere_numerische_spalten
+from physrisiko import berechne_physisches_risiko
+from portfolio_store import lade_portfolio
+from risikogewicht import risikogewichte
 
 # CSV-Datei lesen
-df = pd.read_csv('data/hypothekendaten_final_with_id.csv', delimiter=';')
-
-def flexible_numeric_conversion(value, decimals=2):
-    if isinstance(value, str):
-        try:
-            return round(float(value.replace(',', '.')), decimals)
-        except ValueError:
-            return np.nan
-    elif isinstance(value, (int, float)):
-        return round(value, decimals)
-    else:
-        return np.nan
+df = lade_portfolio('data/hypothekendaten_final_with_id.csv')
 
 # Spalten in numerische Werte umwandeln
 numeric_columns = ['aktuelles_LtV', 'darlehenbetrag', 'aktueller_immobilienwert', 'Schadensfaktor', 'AEP', 'Risikogewicht', 'Ueberschwemmungstiefe', 'Quadratmeterpreise', 'wohnflaeche']
-for col in numeric_columns:
-    if col in df.columns:
-        df[col] = df[col].apply(lambda x: flexible_numeric_conversion(x))
+konvertiere_numerische_spalten(df, numeric_columns, decimals=2)
 
 # Zeilen mit NaN-Werten entfernen
 df = df.dropna(subset=[col for col in numeric_columns if col in df.columns])
 
-# Funktion zur Bestimmung des Risikogewichts basierend auf LtV
-def get_risikogewicht(ltv):
-    if ltv <= 0.50:
-        return 0.20
-    elif 0.50 < ltv <= 0.60:
-        return 0.25
-    elif 0.60 < ltv <= 0.80:
-        return 0.30
-    elif 0.80 < ltv <= 0.90:
-        return 0.40
-    elif 0.90 < ltv <= 1.00:
-        return 0.50
-    else:
-        return 0.70
-
 # Risikogewicht basierend auf aktuelles_LtV neu berechnen
-df['Risikogewicht'] = df['aktuelles_LtV'].apply(get_risikogewicht)
-
-# Funktion zur Berechnung der Werte
-def calculate_values(row):
-    E_j = row['aktueller_immobilienwert']
-    schadenfaktor = row['Schadensfaktor']
-    p_I_ij = row['AEP'] if 'AEP' in row.index else 0.01
-    
-    immobilienschaden = E_j * schadenfaktor
-    EAI = immobilienschaden * p_I_ij
-    neuer_immobilienwert = E_j - immobilienschaden
-    
-    # Neues LtV basierend auf dem neuen Immobilienwert berechnen
-    neue_LtV = row['darlehenbetrag'] / neuer_immobilienwert if neuer_immobilienwert > 0 else np.inf
-    
-    # Neuberechnetes Risikogewicht verwenden
-    risikogewicht = row['Risikogewicht']
-    neue_risikogewicht = get_risikogewicht(neue_LtV)
-    
-    # RWA berechnen
-    akt_RWA = row['darlehenbetrag'] * risikogewicht
-    neue_RWA = row['darlehenbetrag'] * neue_risikogewicht
-    RWA_Änderung = (neue_RWA / akt_RWA) - 1 if akt_RWA > 0 else np.inf
-    
-    return pd.Series({
-        'Immobilienschaden': immobilienschaden, 
-        'EAI': EAI, 
-        'Neuer Immobilienwert': neuer_immobilienwert, 
-        'Neue LtV': neue_LtV, 
-        'Risikogewicht': risikogewicht,
-        'Neue Risikogewicht': neue_risikogewicht,  
-        'Akt. RWA': akt_RWA,
-        'Neue RWA': neue_RWA, 
-        'RWA Änderung': RWA_Änderung
-    })
-
-# Berechnungen auf jede Zeile anwenden
-results = df.apply(calculate_values, axis=1)
+df['Risikogewicht'] = risikogewichte(df['aktuelles_LtV'])
+
+# Berechnungen spaltenweise für das gesamte Portfolio durchführen
+results = berechne_physisches_risiko(df)
 
 # Ergebnisse mit dem ursprünglichen DataFrame kombinieren
 df_results = pd.concat([df, results], axis=1)
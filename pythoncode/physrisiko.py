@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from risikogewicht import STANDARD_REGELWERK, risikogewichte
+
+# Ergebnisspalten des physischen Risikomodells
+ERGEBNIS_SPALTEN = ['Immobilienschaden', 'EAI', 'EI', 'Neuer Immobilienwert', 'Neue LtV',
+                    'Neue Risikogewicht', 'Akt. RWA', 'Neue RWA', 'RWA Änderung']
+
+def berechne_physisches_risiko(df, T=20, standard_aep=0.01, regelwerk=STANDARD_REGELWERK):
+    """Berechnet Schaden, EAI, EI, neuen Wert, LtV und RWA spaltenweise für das gesamte Portfolio."""
+    E_j = df['aktueller_immobilienwert'].to_numpy(dtype=float)
+    schadenfaktor = df['Schadensfaktor'].to_numpy(dtype=float)
+    darlehenbetrag = df['darlehenbetrag'].to_numpy(dtype=float)
+    risikogewicht = df['Risikogewicht'].to_numpy(dtype=float)
+    if 'AEP' in df.columns:
+        p_I_ij = df['AEP'].to_numpy(dtype=float)
+    else:
+        p_I_ij = np.full(len(df), standard_aep)
+
+    # Immobilienschaden, EAI und EI
+    immobilienschaden = E_j * schadenfaktor
+    EAI = immobilienschaden * p_I_ij
+    EI = EAI * T
+
+    # Neuer Immobilienwert und neue LtV (nicht positive Werte ergeben eine unendliche LtV)
+    neuer_immobilienwert = E_j - immobilienschaden
+    with np.errstate(divide='ignore', invalid='ignore'):
+        neue_LtV = np.where(neuer_immobilienwert > 0, darlehenbetrag / neuer_immobilienwert, np.inf)
+
+    # Neues Risikogewicht nach dem gewählten Regelwerk und RWA
+    neue_risikogewicht = risikogewichte(neue_LtV, regelwerk)
+    akt_RWA = darlehenbetrag * risikogewicht
+    neue_RWA = darlehenbetrag * neue_risikogewicht
+    with np.errstate(divide='ignore', invalid='ignore'):
+        RWA_Änderung = np.where(akt_RWA > 0, neue_RWA / akt_RWA - 1, np.inf)
+
+    return pd.DataFrame({
+        'Immobilienschaden': immobilienschaden,
+        'EAI': EAI,
+        'EI': EI,
+        'Neuer Immobilienwert': neuer_immobilienwert,
+        'Neue LtV': neue_LtV,
+        'Neue Risikogewicht': neue_risikogewicht,
+        'Akt. RWA': akt_RWA,
+        'Neue RWA': neue_RWA,
+        'RWA Änderung': RWA_Änderung
+    }, index=df.index)
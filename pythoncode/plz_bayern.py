@@ -0,0 +1,85 @@
+import os
+import sys
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from koordinaten import LAEA
+from zwischenspeicher import ist_aktuell, schreibe_geoparquet
+
+# Quellen: PLZ-Gebiete (Shapefile im ZIP) und Zuordnung PLZ -> Ort/Landkreis/Bundesland
+PLZ_ZIP = os.environ.get('PLZ_ZIP', 'data/plz-5stellig.shp.zip')
+PLZ_ORT_CSV = 'data/zuordnung_plz_ort.csv'
+
+# Vorbereitete PLZ-Gebiete Bayerns in EPSG:3035 (GeoParquet) und Hashes der Quellen
+PLZ_BAYERN = 'data/plz_bayern_epsg3035.parquet'
+
+def baue_plz_bayern(plz_zip=PLZ_ZIP, plz_ort_csv=PLZ_ORT_CSV):
+    """PLZ-Gebiete mit Ort, Landkreis und Einwohnern, gefiltert auf Bayern, in EPSG:3035.
+
+    Die Zeilen sind entlang einer Hilbert-Kurve sortiert, damit benachbarte Gebiete auch in der
+    Datei nah beieinander liegen.
+    """
+    shp_name = os.path.basename(plz_zip).removesuffix('.zip').removesuffix('.shp')
+    plz_shape_df = gpd.read_file(f"zip://{plz_zip}!{shp_name}.shp")
+    plz_shape_df['plz'] = plz_shape_df['plz'].astype(str)
+
+    plz_region_df = pd.read_csv(plz_ort_csv, sep=',', dtype={'plz': str, 'ags': str})
+    plz_region_df = plz_region_df.drop(columns='osm_id')
+    plz_region_df = plz_region_df[plz_region_df['bundesland'] == 'Bayern']
+
+    bayern_df = pd.merge(left=plz_shape_df, right=plz_region_df, on='plz', how='inner')
+    bayern_df = bayern_df.drop(columns=['note'], errors='ignore')
+    # PLZ ohne Einwohnerangabe mit 0 übernehmen (erhalten bei der Punktverteilung keine Punkte)
+    einwohner = pd.to_numeric(bayern_df['einwohner'], errors='coerce')
+    if einwohner.isna().any():
+        print(f"Warnung: {int(einwohner.isna().sum())} PLZ ohne Einwohnerzahl, als 0 übernommen")
+    bayern_df['einwohner'] = einwohner.fillna(0).astype('int64')
+    bayern_df = bayern_df.to_crs(LAEA)
+
+    reihenfolge = np.argsort(bayern_df.hilbert_distance().to_numpy(), kind='stable')
+    return bayern_df.iloc[reihenfolge].reset_index(drop=True)
+
+def _quellen(plz_zip, plz_ort_csv):
+    return {'plz_zip': plz_zip, 'plz_ort_csv': plz_ort_csv}
+
+def plz_bayern_aktuell(ziel=PLZ_BAYERN, plz_zip=PLZ_ZIP, plz_ort_csv=PLZ_ORT_CSV):
+    """Prüft, ob ``ziel`` aus den aktuellen Quelldateien erstellt wurde."""
+    return ist_aktuell(ziel, _quellen(plz_zip, plz_ort_csv))
+
+def erstelle_plz_bayern(ziel=PLZ_BAYERN, plz_zip=PLZ_ZIP, plz_ort_csv=PLZ_ORT_CSV):
+    """Erstellt die GeoParquet-Datei und speichert die Hashes der Quellen daneben."""
+    bayern_df = baue_plz_bayern(plz_zip, plz_ort_csv)
+    schreibe_geoparquet(bayern_df, ziel, _quellen(plz_zip, plz_ort_csv))
+    print(f"PLZ-Gebiete Bayern erstellt: {ziel} ({len(bayern_df)} Zeilen)")
+    return bayern_df
+
+def plz_bayern_dateien(plz_zip=PLZ_ZIP, plz_ort_csv=PLZ_ORT_CSV, ziel=PLZ_BAYERN):
+    """Dateien, aus denen ``lade_plz_bayern`` die Daten bezieht (Quellen bzw. ohne Quellen die vorbereitete Datei)."""
+    if os.path.exists(plz_zip) and os.path.exists(plz_ort_csv):
+        return [plz_zip, plz_ort_csv]
+    return [ziel]
+
+def lade_plz_bayern(plz_zip=PLZ_ZIP, plz_ort_csv=PLZ_ORT_CSV, ziel=PLZ_BAYERN):
+    """Lädt die PLZ-Gebiete Bayerns (EPSG:3035); erstellt die Datei neu, wenn sich die Quellen geändert haben."""
+    quellen_da = os.path.exists(plz_zip) and os.path.exists(plz_ort_csv)
+    if quellen_da and not plz_bayern_aktuell(ziel, plz_zip, plz_ort_csv):
+        return erstelle_plz_bayern(ziel, plz_zip, plz_ort_csv)
+    if not quellen_da:
+        if not os.path.exists(ziel):
+            raise FileNotFoundError(f"Weder Quelldateien ({plz_zip}, {plz_ort_csv}) noch {ziel} gefunden")
+        print(f"Quelldateien nicht gefunden, verwende vorhandene Datei {ziel}")
+    return gpd.read_parquet(ziel)
+
+def main():
+    # Datei (neu) erstellen: python pythoncode/plz_bayern.py [plz_zip] [plz_ort_csv] [ziel]
+    plz_zip = sys.argv[1] if len(sys.argv) > 1 else PLZ_ZIP
+    plz_ort_csv = sys.argv[2] if len(sys.argv) > 2 else PLZ_ORT_CSV
+    ziel = sys.argv[3] if len(sys.argv) > 3 else PLZ_BAYERN
+    if plz_bayern_aktuell(ziel, plz_zip, plz_ort_csv):
+        print(f"{ziel} ist aktuell")
+    else:
+        erstelle_plz_bayern(ziel, plz_zip, plz_ort_csv)
+
+if __name__ == "__main__":
+    main()
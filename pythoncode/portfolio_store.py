@@ -0,0 +1,98 @@
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from einlesen import konvertiere_numerische_spalten
+
+# Explizites Schema des Hypothekenportfolios
+PORTFOLIO_SCHEMA = pa.schema([
+    ('ID', pa.int64()),
+    ('ort', pa.string()),
+    ('landkreis', pa.string()),
+    ('latitude', pa.float64()),
+    ('longitude', pa.float64()),
+    ('GEB_HQ', pa.string()),
+    ('AEP', pa.float64()),
+    ('flood_risk', pa.string()),
+    ('Ueberschwemmungstiefe', pa.float64()),
+    ('Schadensfaktor', pa.float64()),
+    ('Energieklasse', pa.string()),
+    ('Quadratmeterpreise', pa.float64()),
+    ('wohnflaeche', pa.float64()),
+    ('aktueller_immobilienwert', pa.float64()),
+    ('aktuelles_LtV', pa.float64()),
+    ('darlehenbetrag', pa.float64()),
+    ('Risikogewicht', pa.float64()),
+    ('immobilienwert_check', pa.bool_()),
+    ('darlehenbetrag_check', pa.bool_()),
+])
+
+# Dateiendungen: Parquet (komprimiert) bzw. Arrow IPC (unkomprimiert, direkt memory-mapbar)
+PARQUET_ENDUNG = '.parquet'
+ARROW_ENDUNG = '.arrow'
+
+def _schema_fuer(df):
+    """Schema für die vorhandenen Spalten; unbekannte Spalten werden abgeleitet."""
+    felder = []
+    for spalte in df.columns:
+        if spalte in PORTFOLIO_SCHEMA.names:
+            felder.append(PORTFOLIO_SCHEMA.field(spalte))
+        else:
+            felder.append(pa.Table.from_pandas(df[[spalte]], preserve_index=False).schema.field(spalte))
+    return pa.schema(felder)
+
+def _numerische_spalten(df):
+    """Wandelt Textspalten mit Dezimalkomma in die Typen des Schemas um."""
+    df = df.copy()
+    konvertiere_numerische_spalten(df, [feld.name for feld in PORTFOLIO_SCHEMA if pa.types.is_floating(feld.type)])
+    return df
+
+def schreibe_portfolio(df, pfad):
+    """Schreibt das Portfolio typisiert als Parquet- oder Arrow-Datei."""
+    tabelle = pa.Table.from_pandas(_numerische_spalten(df), schema=_schema_fuer(df), preserve_index=False)
+    if pfad.endswith(ARROW_ENDUNG):
+        feather.write_feather(tabelle, pfad, compression='uncompressed')
+    else:
+        pq.write_table(tabelle, pfad, compression='zstd')
+
+def lese_portfolio(pfad, spalten=None):
+    """Liest nur die angeforderten Spalten eines gespeicherten Portfolios (memory-mapped)."""
+    if pfad.endswith(ARROW_ENDUNG):
+        tabelle = feather.read_table(pfad, columns=spalten, memory_map=True)
+    else:
+        tabelle = pq.read_table(pfad, columns=spalten, memory_map=True)
+    return tabelle.to_pandas()
+
+def store_pfad(csv_pfad, endung=PARQUET_ENDUNG):
+    """Pfad der typisierten Portfolio-Datei neben der CSV-Datei."""
+    return os.path.splitext(csv_pfad.replace('\\', '/'))[0] + endung
+
+def portfolio_datei(csv_pfad):
+    """Datei, aus der ``lade_portfolio`` liest: der typisierte Store, falls vorhanden und aktuell, sonst die CSV."""
+    pfad = store_pfad(csv_pfad)
+    csv_vorhanden = os.path.exists(csv_pfad)
+    if os.path.exists(pfad) and (not csv_vorhanden or os.path.getmtime(pfad) >= os.path.getmtime(csv_pfad)):
+        return pfad
+    return csv_pfad
+
+def lade_portfolio(csv_pfad, spalten=None):
+    """Lädt das Portfolio aus dem typisierten Store, falls vorhanden und aktuell, sonst aus der CSV."""
+    pfad = portfolio_datei(csv_pfad)
+    if pfad != csv_pfad:
+        return lese_portfolio(pfad, spalten)
+    return pd.read_csv(csv_pfad, delimiter=';', usecols=spalten)
+
+def main():
+    # CSV-Dateien in den typisierten Store umwandeln
+    csv_dateien = sys.argv[1:] or ['data/hypothekendaten_final_with_statistics.csv']
+    for csv_pfad in csv_dateien:
+        df = pd.read_csv(csv_pfad, delimiter=';')
+        pfad = store_pfad(csv_pfad)
+        schreibe_portfolio(df, pfad)
+        print(f"{csv_pfad} -> {pfad} ({len(df)} Zeilen)")
+
+if __name__ == "__main__":
+    main()
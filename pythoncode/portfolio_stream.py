@@ -0,0 +1,91 @@
+import sys
+
+import pandas as pd
+import pyarrow.parquet as pq
+from einlesen import konvertiere_numerische_spalten
+from physrisiko import berechne_physisches_risiko
+from portfolio_store import PARQUET_ENDUNG
+from transitionsrisiko import ENERGIEVERBRAUCH, transitionsrisiko_summen
+
+# Anzahl der Darlehen, die gleichzeitig im Speicher gehalten werden
+BLOCKGROESSE = 250_000
+
+PORTFOLIO_DATEI = 'data/hypothekendaten_final_with_statistics.csv'
+
+NUMERISCHE_SPALTEN = ['aktueller_immobilienwert', 'Schadensfaktor', 'AEP', 'darlehenbetrag', 'Risikogewicht',
+                      'aktuelles_LtV', 'wohnflaeche', 'Quadratmeterpreise', 'Ueberschwemmungstiefe']
+
+# Spalten, die für die physischen Gruppenkennzahlen aufsummiert werden
+PHYSISCHE_KENNZAHLEN = ['aktueller_immobilienwert', 'darlehenbetrag', 'Immobilienschaden', 'EAI', 'EI',
+                        'Neuer Immobilienwert', 'Akt. RWA', 'Neue RWA']
+
+def lese_portfolio_bloecke(pfad=PORTFOLIO_DATEI, blockgroesse=BLOCKGROESSE, spalten=None):
+    """Liest das Portfolio (CSV oder Parquet) blockweise und wandelt die numerischen Spalten je Block um."""
+    if pfad.endswith(PARQUET_ENDUNG):
+        bloecke = (batch.to_pandas() for batch in pq.ParquetFile(pfad).iter_batches(blockgroesse, columns=spalten))
+    else:
+        bloecke = pd.read_csv(pfad, delimiter=';', usecols=spalten, chunksize=blockgroesse)
+
+    for block in bloecke:
+        konvertiere_numerische_spalten(block, NUMERISCHE_SPALTEN)
+        yield block
+
+def _addiere(gesamt, teil):
+    return teil if gesamt is None else gesamt.add(teil, fill_value=0)
+
+def streame_physisches_risiko(pfad=PORTFOLIO_DATEI, gruppen=('Energieklasse', 'flood_risk', 'landkreis'),
+                              blockgroesse=BLOCKGROESSE, **kwargs):
+    """Berechnet das physische Risiko blockweise und sammelt die Kennzahlen je Gruppe.
+
+    Der Speicherbedarf hängt nur von der Blockgröße und der Anzahl der Gruppen ab.
+    Rückgabe: Dictionary Gruppenspalte -> DataFrame mit Anzahl, Summen und Mittelwerten.
+    """
+    summen = {gruppe: None for gruppe in gruppen}
+    anzahl = {gruppe: None for gruppe in gruppen}
+
+    for block in lese_portfolio_bloecke(pfad, blockgroesse):
+        ergebnisse = pd.concat([block[list(gruppen) + ['aktueller_immobilienwert', 'darlehenbetrag']],
+                                berechne_physisches_risiko(block, **kwargs)], axis=1)
+        for gruppe in gruppen:
+            gruppiert = ergebnisse.groupby(gruppe)[PHYSISCHE_KENNZAHLEN]
+            summen[gruppe] = _addiere(summen[gruppe], gruppiert.sum())
+            anzahl[gruppe] = _addiere(anzahl[gruppe], gruppiert.count())
+
+    ergebnis = {}
+    for gruppe in gruppen:
+        ergebnis[gruppe] = pd.concat({
+            'Anzahl': anzahl[gruppe]['darlehenbetrag'].astype(int).rename('Darlehen'),
+            'Summe': summen[gruppe],
+            'Mittelwert': summen[gruppe] / anzahl[gruppe]
+        }, axis=1).sort_index()
+    return ergebnis
+
+def streame_transitionsrisiko(pfad=PORTFOLIO_DATEI, gruppe='Energieklasse', blockgroesse=BLOCKGROESSE, **kwargs):
+    """Berechnet die Mittelwerte des Transitionsrisikos blockweise je Szenario, Jahr und Gruppe."""
+    energieklassen = list(kwargs.get('energieverbrauch', ENERGIEVERBRAUCH).keys())
+    summen = None
+    anzahl = None
+
+    for block in lese_portfolio_bloecke(pfad, blockgroesse):
+        block = block[block['Energieklasse'].isin(energieklassen)]
+        block_summen, block_anzahl = transitionsrisiko_summen(block, gruppe, blockgroesse, **kwargs)
+        summen = _addiere(summen, block_summen)
+        anzahl = _addiere(anzahl, block_anzahl)
+
+    return (summen / anzahl).sort_index()
+
+def main():
+    pfad = sys.argv[1] if len(sys.argv) > 1 else PORTFOLIO_DATEI
+    blockgroesse = int(sys.argv[2]) if len(sys.argv) > 2 else BLOCKGROESSE
+
+    print(f"Streaming von {pfad} in Blöcken zu {blockgroesse} Darlehen")
+    for gruppe, tabelle in streame_physisches_risiko(pfad, blockgroesse=blockgroesse).items():
+        print(f"\nPhysisches Risiko nach {gruppe}:")
+        print(tabelle[['Anzahl', 'Summe']].round(2).to_string())
+
+    mittelwerte = streame_transitionsrisiko(pfad, blockgroesse=blockgroesse)
+    print("\nTransitionsrisiko (durchschnittliche Wertänderung nach Energieklasse):")
+    print(mittelwerte['wertänderung'].unstack('jahr').round(4).to_string())
+
+if __name__ == "__main__":
+    main()
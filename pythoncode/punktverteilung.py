@@ -0,0 +1,128 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import shapely
+
+# Mindestanteil der Polygonfläche an der Bounding Box für die Schätzung der Blockgröße
+MIN_TREFFERQUOTE = 0.01
+MAX_BLOCK = 1_000_000
+
+# Anzahl der Punkte des synthetischen Portfolios und Startwert der Zufallszahlen
+ZIELANZAHL = 3853
+SAAT = 3853
+
+# Ab dieser Gesamtzahl Punkte werden die Regionen auf einen Prozesspool verteilt
+PARALLEL_AB = 200_000
+
+def _punkte_ablehnung(polygon, anzahl, rng):
+    """Ablehnungsverfahren: Kandidaten blockweise in der Bounding Box ziehen und vektorisiert prüfen."""
+    shapely.prepare(polygon)
+    minx, miny, maxx, maxy = polygon.bounds
+    box_flaeche = (maxx - minx) * (maxy - miny)
+    trefferquote = max(polygon.area / box_flaeche if box_flaeche > 0 else 1.0, MIN_TREFFERQUOTE)
+
+    x_teile, y_teile = [], []
+    gefunden = 0
+    while gefunden < anzahl:
+        # Blockgröße nach erwarteter Trefferquote, mit Reserve, damit meist ein Block reicht
+        n = min(math.ceil((anzahl - gefunden) / trefferquote * 1.2) + 16, MAX_BLOCK)
+        x = rng.uniform(minx, maxx, n)
+        y = rng.uniform(miny, maxy, n)
+        innen = shapely.contains_xy(polygon, x, y)
+        x_teile.append(x[innen])
+        y_teile.append(y[innen])
+        gefunden += int(innen.sum())
+
+    return np.concatenate(x_teile)[:anzahl], np.concatenate(y_teile)[:anzahl]
+
+def _punkte_triangulation(polygon, anzahl, rng):
+    """Exakte Ziehung: Dreieck nach Fläche wählen, dann gleichverteilt im Dreieck (ohne Ablehnung)."""
+    dreiecke = shapely.get_parts(shapely.constrained_delaunay_triangles(polygon))
+    flaechen = shapely.area(dreiecke)
+    ecken = shapely.get_coordinates(shapely.get_exterior_ring(dreiecke)).reshape(len(dreiecke), 4, 2)
+
+    wahl = rng.choice(len(dreiecke), size=anzahl, p=flaechen / flaechen.sum())
+    u = rng.random(anzahl)
+    v = rng.random(anzahl)
+    # Punkte außerhalb des Dreiecks in die andere Hälfte des Parallelogramms spiegeln
+    spiegeln = u + v > 1
+    u[spiegeln] = 1 - u[spiegeln]
+    v[spiegeln] = 1 - v[spiegeln]
+    a, b, c = ecken[wahl, 0], ecken[wahl, 1], ecken[wahl, 2]
+    punkte = a + u[:, None] * (b - a) + v[:, None] * (c - a)
+    return punkte[:, 0], punkte[:, 1]
+
+def zufallspunkte_in_polygon(polygon, anzahl, rng, methode=None):
+    """Gleichverteilte Zufallspunkte in einem (Multi-)Polygon. Rückgabe: (x, y)
+
+    ``methode``: 'triangulation' (exakt, Standard ab shapely 2.1) oder 'ablehnung'
+    (blockweises Ablehnungsverfahren).
+    """
+    if anzahl <= 0 or polygon.is_empty:
+        return np.empty(0), np.empty(0)
+    if methode is None:
+        methode = 'triangulation' if hasattr(shapely, 'constrained_delaunay_triangles') else 'ablehnung'
+    if methode == 'triangulation':
+        return _punkte_triangulation(polygon, anzahl, rng)
+    return _punkte_ablehnung(polygon, anzahl, rng)
+
+def verteile_anzahl(gewichte, gesamt=ZIELANZAHL):
+    """Teilt ``gesamt`` Punkte proportional zu den Gewichten auf (Hare/Niemeyer, größte Reste).
+
+    Jede Region erhält den abgerundeten Anteil, die restlichen Punkte gehen an die Regionen mit den
+    größten Nachkommaresten (bei Gleichstand die erste). Die Summe ist immer genau ``gesamt``.
+    """
+    gewichte = np.asarray(gewichte, dtype=float)
+    anteile = gewichte / gewichte.sum() * gesamt
+    anzahl = np.floor(anteile).astype(int)
+    rest = gesamt - int(anzahl.sum())
+    if rest > 0:
+        anzahl[np.argsort(-(anteile - anzahl), kind='stable')[:rest]] += 1
+    return anzahl
+
+def _punkte_regionen(polygone, anzahl, saaten, methode):
+    """Zieht die Punkte mehrerer Regionen, jede mit ihrem eigenen Zufallsgenerator."""
+    x_teile, y_teile = [], []
+    for polygon, n, saat in zip(polygone, anzahl, saaten):
+        x, y = zufallspunkte_in_polygon(polygon, n, np.random.default_rng(saat), methode)
+        x_teile.append(x)
+        y_teile.append(y)
+    return x_teile, y_teile
+
+def verteile_punkte(gdf, anzahl, spalten=(), saat=SAAT, methode=None, n_prozesse=None, parallel_ab=PARALLEL_AB):
+    """Verteilt je Region (Zeile von ``gdf``) ``anzahl`` Zufallspunkte gleichmäßig im Polygon.
+
+    Jede Region erhält einen eigenen Zufallsstrom (``SeedSequence(saat).spawn``), daher ist das
+    Ergebnis bei gleicher ``saat`` bitgleich, unabhängig von ``n_prozesse``. Ab ``parallel_ab``
+    Punkten werden die Regionen auf einen Prozesspool verteilt; unter Windows muss der Aufruf
+    dann in einem ``if __name__ == "__main__":``-Block stehen.
+    Rückgabe: DataFrame mit den ``spalten`` der Region sowie ``latitude`` (y) und ``longitude`` (x)
+    im Koordinatensystem von ``gdf``, Reihenfolge wie die Regionen.
+    """
+    anzahl = np.asarray(anzahl, dtype=int)
+    polygone = list(gdf.geometry)
+    saaten = np.random.SeedSequence(saat).spawn(len(polygone))
+
+    n_prozesse = n_prozesse or os.cpu_count()
+    if n_prozesse == 1 or anzahl.sum() < parallel_ab:
+        x_teile, y_teile = _punkte_regionen(polygone, anzahl, saaten, methode)
+    else:
+        # Zusammenhängende Abschnitte von Regionen mit etwa gleich vielen Punkten
+        grenzen = np.searchsorted(np.cumsum(anzahl), np.linspace(0, anzahl.sum(), n_prozesse * 4 + 1)[1:-1])
+        abschnitte = np.split(np.arange(len(polygone)), grenzen)
+        x_teile, y_teile = [], []
+        with ProcessPoolExecutor(max_workers=n_prozesse) as pool:
+            auftraege = [pool.submit(_punkte_regionen, [polygone[i] for i in teil], anzahl[teil],
+                                     [saaten[i] for i in teil], methode) for teil in abschnitte if len(teil)]
+            for auftrag in auftraege:
+                x, y = auftrag.result()
+                x_teile.extend(x)
+                y_teile.extend(y)
+
+    punkte = pd.DataFrame({spalte: np.repeat(gdf[spalte].to_numpy(), anzahl) for spalte in spalten})
+    punkte['latitude'] = np.concatenate(y_teile) if y_teile else np.empty(0)
+    punkte['longitude'] = np.concatenate(x_teile) if x_teile else np.empty(0)
+    return punkte
@@ -3,9 +3,12 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from matplotlib.ticker import FuncFormatter
+from einlesen import konvertiere_numerische_spalten
+from physrisiko import berechne_physisches_risiko
+from portfolio_store import lade_portfolio
 
 # Daten von CSV-Datei lesen
-df = pd.read_csv('data/hypothekendaten_final_with_statistics.csv', delimiter=';')
+df = lade_portfolio('data/hypothekendaten_final_with_statistics.csv')
 
 # # Zähle die Anzahl in der Spalte 'flood_risk'
 # flood_risk_counts = df['flood_risk'].value_counts().sort_index()
@@ -41,82 +44,12 @@ df = pd.read_csv('data/hypothekendaten_final_with_statistics.csv', delimiter=';'
 if 'ID' not in df.columns:
     df['ID'] = range(1, len(df) + 1)
 
-# Flexible Konvertierungsfunktion
-def flexible_numeric_conversion(value, decimals=2):
-    if isinstance(value, str):
-        try:
-            return round(float(value.replace(',', '.')), decimals)
-        except ValueError:
-            return np.nan
-    elif isinstance(value, (int, float)):
-        return round(value, decimals)
-    else:
-        return np.nan
-
-# Umwandlung der numerischen Spalten
+# Umwandlung der numerischen Spalten (Dezimalkomma, auf 2 Stellen gerundet)
 numeric_columns = ['aktueller_immobilienwert', 'Schadensfaktor', 'AEP', 'darlehenbetrag', 'Risikogewicht']
-for col in numeric_columns:
-    df[col] = df[col].apply(lambda x: flexible_numeric_conversion(x))
-
-# Funktion zur Bestimmung des neuen Risikogewichts basierend auf dem neuen LtV
-def get_neue_risikogewicht(ltv):
-    if ltv <= 0.50:
-        return 0.20
-    elif 0.50 < ltv <= 0.60:
-        return 0.25
-    elif 0.60 < ltv <= 0.80:
-        return 0.30
-    elif 0.80 < ltv <= 0.90:
-        return 0.40
-    elif 0.90 < ltv <= 1.00:
-        return 0.50
-    else:
-        return 0.70
-
-# Funktion zur Berechnung der Werte
-def calculate_values(row, T=20):
-    E_j = row['aktueller_immobilienwert']
-    schadenfaktor = row['Schadensfaktor']
-    p_I_ij = row['AEP'] if 'AEP' in row.index else 0.01
-
-    # Berechnung des Immobilienschadens
-    immobilienschaden = E_j * schadenfaktor
-
-    # Berechnung des EAI
-    EAI = immobilienschaden * p_I_ij
-
-    # Berechnung des EI
-    EI = EAI * T
-
-    # Berechnung des neuen Immobilienwerts
-    new_immobilienwert = E_j - immobilienschaden
-
-    # Berechnung des neuen LtV
-    new_LtV = row['darlehenbetrag'] / new_immobilienwert if new_immobilienwert > 0 else np.inf
-
-    # Bestimmung des neuen Risikogewichts basierend auf dem neuen LtV
-    neue_risikogewicht = get_neue_risikogewicht(new_LtV)
-
-    # Berechnung des neuen RWA basierend auf dem neuen Risikogewicht
-    new_RWA = row['darlehenbetrag'] * neue_risikogewicht
-
-    # Berechnung der % Änderung von RWA
-    old_RWA = row['darlehenbetrag'] * row['Risikogewicht']
-    RWA_change = (new_RWA / old_RWA) - 1 if old_RWA > 0 else np.inf
-
-    return pd.Series({
-        'Immobilienschaden': immobilienschaden, 
-        'EAI': EAI, 
-        'EI': EI, 
-        'Neuer Immobilienwert': new_immobilienwert, 
-        'Neue LtV': new_LtV, 
-        'Neue Risikogewicht': neue_risikogewicht, 
-        'Neue RWA': new_RWA, 
-        'RWA Änderung': RWA_change
-    })
-
-# Anwenden der Berechnungen auf jede Zeile
-df_results = pd.concat([df, df.apply(calculate_values, axis=1)], axis=1)
+konvertiere_numerische_spalten(df, numeric_columns, decimals=2)
+
+# Spaltenweise Berechnung für das gesamte Portfolio
+df_results = pd.concat([df, berechne_physisches_risiko(df)], axis=1)
 
 # Filtern der Daten, um nur die Zeilen zu behalten, bei denen der Schadensfaktor ungleich 0 ist
 df_damage = df_results[df_results['Schadensfaktor'] != 0].copy()
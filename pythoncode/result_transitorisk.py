@@ -2,140 +2,94 @@ import pandas as pd
 import numpy as np
 from tabulate import tabulate
 import matplotlib.pyplot as plt
+from abbildungen import abbildung, erstelle_abbildungen
+from einlesen import konvertiere_numerische_spalten
+from portfolio_store import lade_portfolio, portfolio_datei
+from transitionsrisiko import ENERGIEPREISE, JAHRE, aggregiere_transitionsrisiko
 
-print("Skript wird gestartet.")
+portfolio_csv = 'data/hypothekendaten_final_with_id.csv'
+energieklassen = ['B', 'C', 'D', 'F', 'G', 'H']
 
-# Daten
-try:
-    df = pd.read_csv('data/hypothekendaten_final_with_id.csv', delimiter=';')
-    print("Daten erfolgreich geladen.")
-except Exception as e:
-    print(f"Fehler beim Laden der Daten: {e}")
-    exit()
+# Energiepreise und Jahre der Szenarien
+energiepreise = ENERGIEPREISE
+jahre = JAHRE
 
-print(f"Anzahl der Zeilen im DataFrame: {len(df)}")
-print(f"Spalten im DataFrame: {df.columns.tolist()}")
+def lade_daten():
+    print("Skript wird gestartet.")
 
-# Umwandlung der erforderlichen Spalten in numerische Typen
-numeric_columns = ['wohnflaeche', 'aktueller_immobilienwert', 'darlehenbetrag', 'aktuelles_LtV']
-for col in numeric_columns:
-    if df[col].dtype == 'object':  # Prüfen, ob die Spalte vom Typ String (object) ist
-        df[col] = pd.to_numeric(df[col].str.replace(',', '.'), errors='coerce')
-    else:
-        df[col] = pd.to_numeric(df[col], errors='coerce')  # Für den Fall, dass die Spalte bereits numerisch ist, aber fehlerhafte Werte enthält
+    # Daten
+    try:
+        df = lade_portfolio(portfolio_csv,
+                            spalten=['Energieklasse', 'wohnflaeche', 'aktueller_immobilienwert', 'darlehenbetrag', 'aktuelles_LtV'])
+        print("Daten erfolgreich geladen.")
+    except Exception as e:
+        print(f"Fehler beim Laden der Daten: {e}")
+        exit()
 
-print("Spalten in numerische Typen umgewandelt.")
+    print(f"Anzahl der Zeilen im DataFrame: {len(df)}")
+    print(f"Spalten im DataFrame: {df.columns.tolist()}")
 
-energieklassen = ['B', 'C', 'D', 'F', 'G', 'H']
-df = df[df['Energieklasse'].isin(energieklassen)]
+    # Umwandlung der erforderlichen Spalten in numerische Typen
+    numeric_columns = ['wohnflaeche', 'aktueller_immobilienwert', 'darlehenbetrag', 'aktuelles_LtV']
+    konvertiere_numerische_spalten(df, numeric_columns)
 
-print(f"Anzahl der Zeilen nach Filterung nach Energieklasse: {len(df)}")
+    print("Spalten in numerische Typen umgewandelt.")
 
-# Energieverbrauch für jede Klasse
-energieverbrauch = {
-    'B': 62.5, 'C': 87.5, 'D': 115, 'F': 180, 'G': 225, 'H': 275
-}
+    df = df[df['Energieklasse'].isin(energieklassen)]
 
-# Spalte 'E_j' hinzufügen
-df['E_j'] = df['Energieklasse'].map(energieverbrauch)
+    print(f"Anzahl der Zeilen nach Filterung nach Energieklasse: {len(df)}")
+    return df
 
-# Konstanten
-E_Aplus = 30
-r = 0.024
-T = 30
+def berechne_ergebnisse(df):
+    print("Beginn der Berechnungen für die Szenarien.")
 
-# Energiepreise für verschiedene Szenarien
-energiepreise = {
-    'Netto-Null': [0.0623, 0.0652, 0.0868, 0.1117, 0.1584, 0.2606, 0.3389],
-    'Ungeordnet': [0.0581, 0.0582, 0.0578, 0.0738, 0.0954, 0.1411, 0.2593],
-    'Unter 2°C': [0.0598, 0.0609, 0.0720, 0.0830, 0.0983, 0.1222, 0.1622],
-    'Aktuelle Richtlinien': [0.0581, 0.0582, 0.0578, 0.0581, 0.0591, 0.0596, 0.0594]
-}
+    # Alle Szenarien und Jahre in einem Durchlauf über das Portfolio berechnen
+    mittelwerte = aggregiere_transitionsrisiko(df, gruppe='Energieklasse', energiepreise=energiepreise, jahre=jahre).sort_index()
 
-jahre = [2023, 2025, 2030, 2035, 2040, 2045, 2050]
+    # Ergebnisse für jedes Szenario
+    ergebnisse = {}
+    for szenario in energiepreise.keys():
+        szenario_ergebnisse = []
 
-def neue_werte_berechnen(zeile, PE_0, PE_1):
-    try:
-        E_j = float(zeile['E_j'])
-        wohnflaeche = float(zeile['wohnflaeche'])
-        aktueller_immobilienwert = float(zeile['aktueller_immobilienwert'])
-        darlehenbetrag = float(zeile['darlehenbetrag'])
-
-        delta_EC_rel = (E_j - E_Aplus) * (PE_1 - PE_0) * wohnflaeche
-        delta_P = -delta_EC_rel * ((1 - (1 + r)**-T) / r)
-        neuer_immobilienwert = aktueller_immobilienwert + delta_P
-        D_t = delta_P / aktueller_immobilienwert
-        neuer_beleihungsauslauf = darlehenbetrag / neuer_immobilienwert
-        
-        return pd.Series({
-            'aktueller_immobilienwert': aktueller_immobilienwert,
-            'neuer_immobilienwert': neuer_immobilienwert, 
-            'aktuelles_LtV': zeile['aktuelles_LtV'],
-            'neuer_beleihungsauslauf': neuer_beleihungsauslauf, 
-            'wertänderung': D_t
-        })
-    except Exception as e:
-        print(f"Fehler in neue_werte_berechnen: {e}")
-        return pd.Series({
-            'aktueller_immobilienwert': np.nan,
-            'neuer_immobilienwert': np.nan, 
-            'aktuelles_LtV': np.nan,
-            'neuer_beleihungsauslauf': np.nan, 
-            'wertänderung': np.nan
-        })
-
-print("Beginn der Berechnungen für die Szenarien.")
-
-# Ergebnisse für jedes Szenario
-ergebnisse = {}
-for szenario in energiepreise.keys():
-    print(f"Verarbeite Szenario: {szenario}")
-    szenario_ergebnisse = []
-    
-    for i, jahr in enumerate(jahre):
-        print(f"  Verarbeite Jahr: {jahr}")
-        PE_0 = energiepreise[szenario][0]
-        PE_1 = energiepreise[szenario][i]
-
-        # Anwendung der Berechnung auf jede Zeile
-        df_result = df.apply(lambda zeile: neue_werte_berechnen(zeile, PE_0, PE_1), axis=1)
-
-        # Berechnung der Durchschnittswerte nach Energieklasse
-        durchschnittliche_ergebnisse = df_result.groupby(df['Energieklasse']).mean().rename(columns={
-            'aktueller_immobilienwert': f'durchschnittlicher_aktueller_immobilienwert_{jahr}',
-            'neuer_immobilienwert': f'durchschnittlicher_neuer_immobilienwert_{jahr}',
-            'aktuelles_LtV': f'durchschnittliches_aktuelles_LtV_{jahr}',
-            'neuer_beleihungsauslauf': f'durchschnittlicher_neuer_beleihungsauslauf_{jahr}',
-            'wertänderung': f'durchschnittliche_wertänderung_{jahr}'
-        })
-
-        szenario_ergebnisse.append(durchschnittliche_ergebnisse)
-
-    # Zusammenführung der Ergebnisse aller Jahre
-    ergebnisse[szenario] = pd.concat(szenario_ergebnisse, axis=1)
-
-print("Berechnungen abgeschlossen. Beginn der Ergebnisausgabe.")
-
-# Ausgabe der Ergebnisse
-for szenario, daten in ergebnisse.items():
-    print(f"\nErgebnisse für das Szenario {szenario}:")
-    print(daten.head())  # Überprüfung der Ergebnisdaten vor dem Speichern
-
-    # Erstellung der Ergebnistabelle
-    result_table = pd.DataFrame(index=energieklassen)
-    
-    for jahr in jahre:
-        try:
-            result_table[f'{jahr} Aktueller Wert'] = daten[f'durchschnittlicher_aktueller_immobilienwert_{jahr}'].round(2)
-            result_table[f'{jahr} Neuer Wert'] = daten[f'durchschnittlicher_neuer_immobilienwert_{jahr}'].round(2)
-            result_table[f'{jahr} Aktuelles LtV'] = daten[f'durchschnittliches_aktuelles_LtV_{jahr}'].round(4)
-            result_table[f'{jahr} Neues LtV'] = daten[f'durchschnittlicher_neuer_beleihungsauslauf_{jahr}'].round(4)
-            result_table[f'{jahr} Wertänderung'] = daten[f'durchschnittliche_wertänderung_{jahr}'].round(4)
-        except KeyError as e:
-            print(f"Fehler: Keine Daten für das Jahr {jahr} im Szenario {szenario} gefunden: {e}")
-    
-    #print("Ergebnistabelle wurde erstellt.")
-    #print(result_table)  # Ausgabe des DataFrames
+        for jahr in jahre:
+            # Durchschnittswerte nach Energieklasse für das Jahr
+            durchschnittliche_ergebnisse = mittelwerte.loc[(szenario, jahr)].rename(columns={
+                'aktueller_immobilienwert': f'durchschnittlicher_aktueller_immobilienwert_{jahr}',
+                'neuer_immobilienwert': f'durchschnittlicher_neuer_immobilienwert_{jahr}',
+                'aktuelles_LtV': f'durchschnittliches_aktuelles_LtV_{jahr}',
+                'neuer_beleihungsauslauf': f'durchschnittlicher_neuer_beleihungsauslauf_{jahr}',
+                'wertänderung': f'durchschnittliche_wertänderung_{jahr}'
+            })
+
+            szenario_ergebnisse.append(durchschnittliche_ergebnisse)
+
+        # Zusammenführung der Ergebnisse aller Jahre
+        ergebnisse[szenario] = pd.concat(szenario_ergebnisse, axis=1)
+    return ergebnisse
+
+def gib_ergebnisse_aus(ergebnisse):
+    print("Berechnungen abgeschlossen. Beginn der Ergebnisausgabe.")
+
+    # Ausgabe der Ergebnisse
+    for szenario, daten in ergebnisse.items():
+        print(f"\nErgebnisse für das Szenario {szenario}:")
+        print(daten.head())  # Überprüfung der Ergebnisdaten vor dem Speichern
+
+        # Erstellung der Ergebnistabelle
+        result_table = pd.DataFrame(index=energieklassen)
+
+        for jahr in jahre:
+            try:
+                result_table[f'{jahr} Aktueller Wert'] = daten[f'durchschnittlicher_aktueller_immobilienwert_{jahr}'].round(2)
+                result_table[f'{jahr} Neuer Wert'] = daten[f'durchschnittlicher_neuer_immobilienwert_{jahr}'].round(2)
+                result_table[f'{jahr} Aktuelles LtV'] = daten[f'durchschnittliches_aktuelles_LtV_{jahr}'].round(4)
+                result_table[f'{jahr} Neues LtV'] = daten[f'durchschnittlicher_neuer_beleihungsauslauf_{jahr}'].round(4)
+                result_table[f'{jahr} Wertänderung'] = daten[f'durchschnittliche_wertänderung_{jahr}'].round(4)
+            except KeyError as e:
+                print(f"Fehler: Keine Daten für das Jahr {jahr} im Szenario {szenario} gefunden: {e}")
+
+        #print("Ergebnistabelle wurde erstellt.")
+        #print(result_table)  # Ausgabe des DataFrames
 
 colors = {
     'B': 'red',
@@ -148,7 +102,7 @@ colors = {
 plt.rcParams.update({'font.size': 11})
 
 def plot_scenario(szenario, ergebnisse):
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
 
     # Schleife über die Energieklassen zum Zeichnen der Daten
     for klasse in energieklassen:
@@ -168,11 +122,10 @@ def plot_scenario(szenario, ergebnisse):
     plt.legend()
     plt.grid(True)
 
-    # Diagramm anzeigen
-    plt.show()
+    return fig
 
 def plot_percentage_change(szenario, ergebnisse):
-    plt.figure(figsize=(12, 8))
+    fig = plt.figure(figsize=(12, 8))
 
     for klasse in energieklassen:
         if klasse in ergebnisse[szenario].index:
@@ -191,10 +144,31 @@ def plot_percentage_change(szenario, ergebnisse):
     plt.ylabel('Prozentuale Wertänderung (%)')
     plt.legend()
     plt.grid(True)
-    plt.savefig(f'{szenario}_percentage_change_plot.png')
-    plt.close()
-
-# Aufruf der Funktion zum Zeichnen des Diagramms für jedes Szenario
-for szenario in energiepreise.keys():
-    print(f"Erzeuge Diagramm für Szenario: {szenario}")
-    plot_percentage_change(szenario, ergebnisse)
\ No newline at end of file
+    return fig
+
+def _ergebnisse_vorbereiten():
+    # Nur aufgerufen, wenn ein Diagramm neu erstellt werden muss (siehe abbildungen.py)
+    return {'ergebnisse': berechne_ergebnisse(lade_daten())}
+
+def abbildungen(ergebnisse=None):
+    # Mit Ergebnissen: je Szenario nur dessen Ergebnisse übergeben, damit Änderungen nur das betroffene
+    # Diagramm neu erzeugen. Ohne Ergebnisse werden sie nur bei Bedarf aus dem Portfolio berechnet.
+    if ergebnisse is None:
+        return [abbildung(f'figures/{szenario}_percentage_change_plot.png', plot_percentage_change,
+                          quellen=[portfolio_datei(portfolio_csv)], vorbereitung=_ergebnisse_vorbereiten,
+                          szenario=szenario)
+                for szenario in energiepreise.keys()]
+    return [abbildung(f'figures/{szenario}_percentage_change_plot.png', plot_percentage_change,
+                      szenario=szenario, ergebnisse={szenario: ergebnisse[szenario]})
+            for szenario in energiepreise.keys()]
+
+def main():
+    df = lade_daten()
+    ergebnisse = berechne_ergebnisse(df)
+    gib_ergebnisse_aus(ergebnisse)
+
+    # Diagramme für jedes Szenario (nur bei geänderten Ergebnissen, siehe abbildungen.py)
+    erstelle_abbildungen(abbildungen(ergebnisse))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+# Tabellen der Risikogewichte je Regelwerk (LtV-Obergrenzen inklusive)
+REGELWERK_DATEI = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'risikogewichte.json')
+STANDARD_REGELWERK = 'CRR3'
+
+@lru_cache(maxsize=None)
+def lade_regelwerke(pfad=REGELWERK_DATEI):
+    """Liest alle Regelwerke einmalig ein und legt sie als sortierte Grenzen-Arrays ab."""
+    with open(pfad, encoding='utf-8') as f:
+        daten = json.load(f)
+
+    regelwerke = {}
+    for name, tabelle in daten.items():
+        grenzen = np.asarray(tabelle['ltv_grenzen'], dtype=float)
+        gewichte = np.asarray(tabelle['risikogewichte'], dtype=float)
+        if len(gewichte) != len(grenzen) + 1:
+            raise ValueError(f"Regelwerk {name}: Es werden {len(grenzen) + 1} Risikogewichte für {len(grenzen)} Grenzen erwartet.")
+        if np.any(np.diff(grenzen) <= 0):
+            raise ValueError(f"Regelwerk {name}: Die LtV-Grenzen müssen streng aufsteigend sein.")
+        regelwerke[name] = (grenzen, gewichte)
+    return regelwerke
+
+def risikogewichte(ltv, regelwerk=STANDARD_REGELWERK, nan_gewicht=None, pfad=REGELWERK_DATEI):
+    """Bestimmt die Risikogewichte für ein ganzes LtV-Array (oder einen einzelnen Wert) mit einer einzigen Bucket-Suche.
+
+    Unendliche LtV-Werte fallen in den obersten Bucket. NaN erhält ``nan_gewicht``
+    bzw. ohne Angabe das höchste Risikogewicht des Regelwerks.
+    """
+    regelwerke = lade_regelwerke(pfad)
+    if regelwerk not in regelwerke:
+        raise KeyError(f"Unbekanntes Regelwerk: {regelwerk}. Verfügbar: {sorted(regelwerke)}")
+    grenzen, gewichte = regelwerke[regelwerk]
+
+    ltv = np.asarray(ltv, dtype=float)
+    # side='left': ein LtV genau auf der Grenze gehört noch zum unteren Bucket
+    ergebnis = gewichte[np.searchsorted(grenzen, ltv, side='left')]
+
+    # np.where statt Zuweisung, damit auch ein einzelner (0-dimensionaler) LtV-Wert funktioniert
+    ergebnis = np.where(np.isnan(ltv), gewichte[-1] if nan_gewicht is None else nan_gewicht, ergebnis)
+    return ergebnis[()] if ergebnis.ndim == 0 else ergebnis
+
+def main():
+    # Kurze Prüfung der Randfälle für einzelne Werte und Arrays
+    grenzen, gewichte = lade_regelwerke()[STANDARD_REGELWERK]
+    assert risikogewichte(np.nan) == gewichte[-1]
+    assert risikogewichte(np.nan, nan_gewicht=1.5) == 1.5
+    assert risikogewichte(np.inf) == gewichte[-1]
+    assert risikogewichte(-0.1) == gewichte[0]
+    assert risikogewichte(grenzen[0]) == gewichte[0]
+    werte = risikogewichte([np.nan, np.inf, -0.1, grenzen[0], grenzen[-1] + 0.01])
+    assert np.array_equal(werte, [gewichte[-1], gewichte[-1], gewichte[0], gewichte[0], gewichte[-1]])
+    print("Risikogewichte: alle Prüfungen bestanden")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+# Energieverbrauch (kWh/m² pro Jahr) für jede Energieklasse
+ENERGIEVERBRAUCH = {
+    'B': 62.5, 'C': 87.5, 'D': 115, 'F': 180, 'G': 225, 'H': 275
+}
+
+# Konstanten
+E_APLUS = 30
+ZINS = 0.024
+LAUFZEIT = 30
+
+# Energiepreise für verschiedene Szenarien
+ENERGIEPREISE = {
+    'Netto-Null': [0.0623, 0.0652, 0.0868, 0.1117, 0.1584, 0.2606, 0.3389],
+    'Ungeordnet': [0.0581, 0.0582, 0.0578, 0.0738, 0.0954, 0.1411, 0.2593],
+    'Unter 2°C': [0.0598, 0.0609, 0.0720, 0.0830, 0.0983, 0.1222, 0.1622],
+    'Aktuelle Richtlinien': [0.0581, 0.0582, 0.0578, 0.0581, 0.0591, 0.0596, 0.0594]
+}
+
+JAHRE = [2023, 2025, 2030, 2035, 2040, 2045, 2050]
+
+# Kennzahlen des Würfels in der Reihenfolge der bisherigen Ergebnistabellen
+KENNZAHLEN = ['aktueller_immobilienwert', 'neuer_immobilienwert', 'aktuelles_LtV',
+              'neuer_beleihungsauslauf', 'wertänderung']
+
+def energiepreis_matrix(energiepreise=ENERGIEPREISE):
+    """Wandelt die Energiepreise in eine Matrix (Szenario x Jahr) um."""
+    szenarien = list(energiepreise.keys())
+    preise = np.array([energiepreise[szenario] for szenario in szenarien], dtype=float)
+    return szenarien, preise
+
+def berechne_transitionswuerfel(df, energiepreise=ENERGIEPREISE, jahre=JAHRE, energieverbrauch=ENERGIEVERBRAUCH,
+                                E_Aplus=E_APLUS, r=ZINS, T=LAUFZEIT):
+    """Berechnet alle Szenarien und Jahre für alle Darlehen in einem Broadcast-Schritt.
+
+    Rückgabe ist ein Dictionary mit den Achsenbeschriftungen ('szenarien', 'jahre', 'index')
+    und je Kennzahl einem Array der Form (Szenario, Jahr, Darlehen).
+    """
+    szenarien, preise = energiepreis_matrix(energiepreise)
+    if preise.shape[1] != len(jahre):
+        raise ValueError(f"Es werden {len(jahre)} Energiepreise je Szenario erwartet, gefunden: {preise.shape[1]}")
+
+    E_j = df['Energieklasse'].map(energieverbrauch).to_numpy(dtype=float)
+    wohnflaeche = df['wohnflaeche'].to_numpy(dtype=float)
+    aktueller_immobilienwert = df['aktueller_immobilienwert'].to_numpy(dtype=float)
+    darlehenbetrag = df['darlehenbetrag'].to_numpy(dtype=float)
+    aktuelles_LtV = df['aktuelles_LtV'].to_numpy(dtype=float)
+
+    # Preisänderung gegenüber dem ersten Jahr je Szenario: PE_1 - PE_0
+    delta_PE = preise - preise[:, :1]
+
+    # Darlehensabhängiger Faktor (E_j - E_Aplus) * wohnflaeche * Rentenbarwertfaktor
+    rentenbarwertfaktor = (1 - (1 + r) ** -T) / r
+    faktor = (E_j - E_Aplus) * wohnflaeche * rentenbarwertfaktor
+
+    # delta_P = -delta_EC_rel * Rentenbarwertfaktor für (Szenario, Jahr, Darlehen)
+    delta_P = -delta_PE[:, :, np.newaxis] * faktor[np.newaxis, np.newaxis, :]
+    form = delta_P.shape
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        neuer_immobilienwert = aktueller_immobilienwert + delta_P
+        wertänderung = delta_P / aktueller_immobilienwert
+        neuer_beleihungsauslauf = darlehenbetrag / neuer_immobilienwert
+
+    return {
+        'szenarien': szenarien,
+        'jahre': list(jahre),
+        'index': df.index,
+        'aktueller_immobilienwert': np.broadcast_to(aktueller_immobilienwert, form),
+        'neuer_immobilienwert': neuer_immobilienwert,
+        'aktuelles_LtV': np.broadcast_to(aktuelles_LtV, form),
+        'neuer_beleihungsauslauf': neuer_beleihungsauslauf,
+        'wertänderung': wertänderung
+    }
+
+def transitionsrisiko_summen(df, gruppe='Energieklasse', blockgroesse=200_000, **kwargs):
+    """Berechnet Summen und Anzahl gültiger Werte je Szenario, Jahr und Gruppe.
+
+    Das Portfolio wird in Blöcken von ``blockgroesse`` Darlehen verarbeitet, sodass
+    nie der vollständige Würfel im Speicher liegt. Summen mehrerer Teilportfolios
+    lassen sich addieren und erst am Ende in Mittelwerte umrechnen.
+    """
+    codes, gruppen = pd.factorize(df[gruppe], sort=True)
+    szenarien = list(kwargs.get('energiepreise', ENERGIEPREISE).keys())
+    jahre = list(kwargs.get('jahre', JAHRE))
+    form = (len(KENNZAHLEN) * len(szenarien) * len(jahre), len(gruppen))
+    summen = np.zeros(form)
+    anzahl = np.zeros(form)
+
+    for start in range(0, len(df), blockgroesse):
+        block_codes = codes[start:start + blockgroesse]
+        gueltig = block_codes >= 0
+        wuerfel = berechne_transitionswuerfel(df.iloc[start:start + blockgroesse][gueltig], **kwargs)
+        block_codes = block_codes[gueltig]
+
+        # (Kennzahl * Szenario * Jahr, Darlehen) -> Gruppensummen per bincount je Zeile
+        werte = np.stack([wuerfel[kennzahl] for kennzahl in KENNZAHLEN]).reshape(form[0], -1)
+        vorhanden = ~np.isnan(werte)
+        for zeile in range(form[0]):
+            summen[zeile] += np.bincount(block_codes[vorhanden[zeile]], weights=werte[zeile, vorhanden[zeile]],
+                                         minlength=len(gruppen))
+            anzahl[zeile] += np.bincount(block_codes[vorhanden[zeile]], minlength=len(gruppen))
+
+    # (Kennzahl, Szenario, Jahr, Gruppe) -> lange Tabellen mit einer Spalte je Kennzahl
+    index = pd.MultiIndex.from_product([szenarien, jahre, gruppen], names=['szenario', 'jahr', gruppe])
+    return (pd.DataFrame(summen.reshape(len(KENNZAHLEN), -1).T, index=index, columns=KENNZAHLEN),
+            pd.DataFrame(anzahl.reshape(len(KENNZAHLEN), -1).T, index=index, columns=KENNZAHLEN))
+
+def aggregiere_transitionsrisiko(df, gruppe='Energieklasse', blockgroesse=200_000, **kwargs):
+    """Berechnet die Mittelwerte je Szenario, Jahr und Gruppe.
+
+    NaN-Werte werden wie bei ``groupby().mean()`` ignoriert.
+    """
+    summen, anzahl = transitionsrisiko_summen(df, gruppe, blockgroesse, **kwargs)
+    return summen / anzahl
@@ -0,0 +1,330 @@
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import rasterio
+from dgm import hoehen_aus_kacheln
+from dgm_index import hoehen_aus_index
+from koordinaten import UTM32, WGS84, transformiere
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+from scipy import ndimage, sparse
+from scipy.sparse.csgraph import connected_components
+
+# Block- bzw. Kachelgröße (Pixel) für das Tiefenraster
+TIEFEN_BLOCKGROESSE = 512
+TIEFEN_UEBERSICHTEN = (2, 4, 8, 16, 32)
+
+# Blockgröße (Pixel) für die blockweise Zusammenhangsanalyse
+VERBUND_BLOCKGROESSE = 2048
+
+# Geöffnetes DGM im Worker-Prozess (wird einmalig über den Initializer gesetzt)
+_dgm = {}
+
+def absoluter_wasserstand(pegelstand_cm, pegelnullpunkt_m):
+    """Absoluter Wasserstand in m NHN aus Pegelstand (cm) und Pegelnullpunkt (m NHN)."""
+    return pegelnullpunkt_m + (pegelstand_cm / 100)
+
+def pixel_koordinaten(transform, rows, cols, pixel_mitte=True):
+    """Koordinaten von Pixeln aus der affinen Transformation (Pixelmitte oder linke obere Ecke)."""
+    versatz = 0.5 if pixel_mitte else 0.0
+    return transform * (np.asarray(cols) + versatz, np.asarray(rows) + versatz)
+
+def scanne_flutpunkte(elevation, transform, pegelstand_cm, pegelnullpunkt_m, step=1, min_tiefe=0.5,
+                      dgm_crs=UTM32, pixel_mitte=True, saatpunkte=None):
+    """Berechnet die Überschwemmungstiefe für das ganze (bzw. jedes ``step``-te) Pixel auf einmal.
+
+    Tiefe = Wasserstand - Geländehöhe, auf 0 begrenzt und auf 2 Dezimalstellen gerundet.
+    Mit ``saatpunkte`` (x, y im System des DGM, z. B. Pegel oder Flusslauf) zählen nur Flächen,
+    die mit diesen Punkten zusammenhängen, statt aller Senken unter dem Wasserstand.
+    Nur Pixel mit Tiefe > ``min_tiefe`` werden in einem Aufruf nach WGS 84 umgerechnet.
+    Rückgabe: DataFrame mit Breitengrad, Längengrad und Hochwassertiefe (m)
+    """
+    wasserstand = absoluter_wasserstand(pegelstand_cm, pegelnullpunkt_m)
+    if saatpunkte is not None:
+        elevation = np.where(verbundene_flutmaske(elevation, transform, wasserstand, *saatpunkte), elevation, np.inf)
+    hoehen = np.asarray(elevation)[::step, ::step]
+    tiefe = np.round(np.maximum(wasserstand - hoehen, 0), 2)
+
+    # NaN-Höhen ergeben NaN-Tiefen und fallen durch den Vergleich heraus
+    rows, cols = np.nonzero(tiefe > min_tiefe)
+    x, y = pixel_koordinaten(transform, rows * step, cols * step, pixel_mitte)
+    lon, lat = transformiere(x, y, dgm_crs, WGS84)
+
+    return pd.DataFrame({
+        'Breitengrad': lat,
+        'Längengrad': lon,
+        'Hochwassertiefe (m)': tiefe[rows, cols]
+    })
+
+def _struktur(verbindung):
+    """Nachbarschaft für die Zusammenhangsanalyse: 4 (Kanten) oder 8 (Kanten und Ecken)."""
+    return ndimage.generate_binary_structure(2, 1 if verbindung == 4 else 2)
+
+def _saat_pixel(transform, saat_x, saat_y):
+    """Pixel (Zeile, Spalte), in denen die Saatpunkte liegen."""
+    col, row = ~transform * (np.atleast_1d(np.asarray(saat_x, dtype=float)), np.atleast_1d(np.asarray(saat_y, dtype=float)))
+    return np.floor(row).astype(int), np.floor(col).astype(int)
+
+def verbundene_flutmaske(elevation, transform, wasserstand, saat_x, saat_y, verbindung=8):
+    """Maske der Pixel unter dem Wasserstand, die mit einem Saatpunkt zusammenhängen (Array im Speicher)."""
+    labels, _ = ndimage.label(np.asarray(elevation) < wasserstand, structure=_struktur(verbindung))
+    rows, cols = _saat_pixel(transform, saat_x, saat_y)
+    innen = (rows >= 0) & (rows < labels.shape[0]) & (cols >= 0) & (cols < labels.shape[1])
+    saat_labels = labels[rows[innen], cols[innen]]
+    if not (saat_labels > 0).any():
+        print("Warnung: Kein Saatpunkt liegt unter dem Wasserstand")
+    return np.isin(labels, saat_labels[saat_labels > 0])
+
+def flutpunkte_nach_tiefe(punkte):
+    """Gruppiert die Punkte aus ``scanne_flutpunkte`` nach Tiefe: {Tiefe: [(lat, lon), ...]}.
+
+    Reihenfolge der Tiefen und der Punkte je Tiefe wie beim zeilenweisen Scan.
+    """
+    tiefen = punkte['Hochwassertiefe (m)'].to_numpy()
+    werte, erste, gruppe = np.unique(tiefen, return_index=True, return_inverse=True)
+    reihenfolge = np.argsort(gruppe, kind='stable')
+    grenzen = np.r_[0, np.cumsum(np.bincount(gruppe, minlength=len(werte)))]
+    lat = punkte['Breitengrad'].to_numpy()[reihenfolge].tolist()
+    lon = punkte['Längengrad'].to_numpy()[reihenfolge].tolist()
+
+    flood_points = defaultdict(list)
+    for g in np.argsort(erste):
+        flood_points[werte[g]] = list(zip(lat[grenzen[g]:grenzen[g + 1]], lon[grenzen[g]:grenzen[g + 1]]))
+    return flood_points
+
+def tiefen_an_punkten(latitude, longitude, kacheln, pegelstand_cm, pegelnullpunkt_m, bilinear=False, dgm_crs=UTM32):
+    """Geländehöhe und Überschwemmungstiefe für viele Punkte (z. B. alle Darlehen) auf einmal.
+
+    Die Koordinaten (WGS 84) werden in einem Aufruf umgerechnet, jede DGM-Kachel wird einmal gelesen.
+    ``kacheln`` ist eine Liste von DGM-Dateien oder ein Kachelindex aus ``dgm_index``.
+    Rückgabe: DataFrame mit Geländehöhe, Ueberschwemmungstiefe und ausserhalb_DGM
+    """
+    x, y = transformiere(longitude, latitude, WGS84, dgm_crs)
+    if isinstance(kacheln, dict):
+        hoehen, ausserhalb = hoehen_aus_index(kacheln, x, y, bilinear)
+    else:
+        hoehen, ausserhalb = hoehen_aus_kacheln(kacheln, x, y, bilinear)
+    wasserstand = absoluter_wasserstand(pegelstand_cm, pegelnullpunkt_m)
+    return pd.DataFrame({
+        'Geländehöhe': hoehen,
+        'Ueberschwemmungstiefe': np.maximum(wasserstand - hoehen, 0),
+        'ausserhalb_DGM': ausserhalb
+    }, index=getattr(latitude, 'index', None))
+
+def _init_tiefen_worker(dgm_pfad, wasserstand):
+    _dgm['src'] = rasterio.open(dgm_pfad)
+    _dgm['wasserstand'] = wasserstand
+
+def _nodata_maske(hoehen, nodata):
+    """NoData-Pixel eines Blocks: NaN sowie der NoData-Wert des DGM (falls gesetzt)."""
+    maske = np.isnan(hoehen)
+    if nodata is not None and not np.isnan(nodata):
+        maske |= hoehen == nodata
+    return maske
+
+def _tiefe_block(fenster):
+    """Überschwemmungstiefe für einen Block des DGM (NoData -> NaN)."""
+    src = _dgm['src']
+    hoehen = src.read(1, window=fenster).astype(np.float32)
+    hoehen[_nodata_maske(hoehen, src.nodata)] = np.nan
+    return fenster, np.maximum(np.float32(_dgm['wasserstand']) - hoehen, np.float32(0))
+
+def schreibe_tiefenraster(dgm_pfad, ziel_pfad, pegelstand_cm, pegelnullpunkt_m, blockgroesse=TIEFEN_BLOCKGROESSE,
+                          n_prozesse=None, uebersichten=TIEFEN_UEBERSICHTEN):
+    """Schreibt die Überschwemmungstiefe (Wasserstand - Geländehöhe, mindestens 0) als GeoTIFF.
+
+    Das DGM wird blockweise auf einen Prozesspool verteilt; das Ergebnis ist ein gekacheltes,
+    komprimiertes GeoTIFF (float32, NoData = NaN) mit Übersichten. Unter Windows muss der
+    Aufruf in einem ``if __name__ == "__main__":``-Block stehen.
+    """
+    wasserstand = absoluter_wasserstand(pegelstand_cm, pegelnullpunkt_m)
+    with rasterio.open(dgm_pfad) as src:
+        profil = src.profile.copy()
+        hoehe, breite = src.height, src.width
+    profil.update(driver='GTiff', dtype='float32', count=1, nodata=np.nan, tiled=True, blockxsize=blockgroesse,
+                  blockysize=blockgroesse, compress='deflate', predictor=3, BIGTIFF='IF_SAFER')
+
+    bloecke = [Window(spalte, zeile, min(blockgroesse, breite - spalte), min(blockgroesse, hoehe - zeile))
+               for zeile in range(0, hoehe, blockgroesse) for spalte in range(0, breite, blockgroesse)]
+
+    with rasterio.open(ziel_pfad, 'w', **profil) as dst:
+        if n_prozesse == 1:
+            _init_tiefen_worker(dgm_pfad, wasserstand)
+            for fenster in bloecke:
+                dst.write(_tiefe_block(fenster)[1], 1, window=fenster)
+            _dgm.pop('src').close()
+        else:
+            with ProcessPoolExecutor(max_workers=n_prozesse or os.cpu_count(), initializer=_init_tiefen_worker,
+                                     initargs=(dgm_pfad, wasserstand)) as pool:
+                for fenster, tiefe in pool.map(_tiefe_block, bloecke, chunksize=4):
+                    dst.write(tiefe, 1, window=fenster)
+
+        uebersichten = [faktor for faktor in uebersichten if max(hoehe, breite) // faktor >= blockgroesse // 2]
+        if uebersichten:
+            dst.build_overviews(uebersichten, Resampling.average)
+            dst.update_tags(ns='rio_overview', resampling='average')
+    print(f"Tiefenraster geschrieben: {ziel_pfad} (Wasserstand {wasserstand:.2f} m NHN)")
+    return ziel_pfad
+
+def pegel_sweep(elevation, pegelstaende_cm, pegelnullpunkt_m, pixelflaeche=1.0, darlehen_hoehen=None,
+                tiefenklassen=(0.5, 1.0, 2.0), nodata=None):
+    """Sensitivitätstabelle für beliebig viele Pegelstände aus einmal sortierten Geländehöhen.
+
+    Die Höhen werden einmal sortiert und kumuliert; Fläche, Volumen und Tiefenverteilung je
+    Pegelstand ergeben sich dann über ``searchsorted`` ohne erneuten Scan des DGM. Mit
+    ``darlehen_hoehen`` (Geländehöhe je Darlehen) wird die Zahl betroffener Darlehen ergänzt.
+    Pixel mit dem NoData-Wert ``nodata`` (z. B. ``src.nodata``) und NaN werden nicht gezählt;
+    ``pixelflaeche`` in m², z. B. ``abs(transform.a * transform.e)``.
+    Rückgabe: DataFrame mit einer Zeile je Pegelstand (cm)
+    """
+    hoehen = np.asarray(elevation, dtype=float).ravel()
+    gueltig = np.isfinite(hoehen)
+    if nodata is not None:
+        gueltig &= hoehen != nodata
+    hoehen = np.sort(hoehen[gueltig])
+    kumuliert = np.r_[0.0, np.cumsum(hoehen)]
+
+    pegelstaende_cm = np.atleast_1d(np.asarray(pegelstaende_cm, dtype=float))
+    wasserstand = absoluter_wasserstand(pegelstaende_cm, pegelnullpunkt_m)
+    n = np.searchsorted(hoehen, wasserstand, side='left')
+    volumen = (wasserstand * n - kumuliert[n]) * pixelflaeche
+
+    tabelle = pd.DataFrame({
+        'Wasserstand (m NHN)': wasserstand,
+        'Überflutete Fläche (m²)': n * pixelflaeche,
+        'Volumen (m³)': volumen
+    }, index=pd.Index(pegelstaende_cm, name='Pegelstand (cm)'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tabelle['Mittlere Tiefe (m)'] = volumen / (n * pixelflaeche)
+    # Median und Maximum der Tiefe über die Ränge der sortierten Höhen
+    tabelle['Median Tiefe (m)'] = np.where(n > 0, wasserstand - hoehen[np.maximum(n - 1, 0) // 2], np.nan)
+    tabelle['Max. Tiefe (m)'] = np.where(n > 0, wasserstand - hoehen[0], np.nan) if len(hoehen) else np.nan
+    for tiefe in tiefenklassen:
+        tabelle[f'Fläche > {tiefe:g} m (m²)'] = np.searchsorted(hoehen, wasserstand - tiefe, side='left') * pixelflaeche
+
+    if darlehen_hoehen is not None:
+        darlehen = np.asarray(darlehen_hoehen, dtype=float)
+        darlehen = np.sort(darlehen[np.isfinite(darlehen)])
+        tabelle['Betroffene Darlehen'] = np.searchsorted(darlehen, wasserstand, side='left')
+        for tiefe in tiefenklassen:
+            tabelle[f'Darlehen > {tiefe:g} m'] = np.searchsorted(darlehen, wasserstand - tiefe, side='left')
+    return tabelle
+
+def _label_block(src, fenster, wasserstand, struktur):
+    """Flutflächen eines Blocks (Höhe < Wasserstand) mit lokalen Labels."""
+    hoehen = src.read(1, window=fenster)
+    maske = (hoehen < wasserstand) & ~_nodata_maske(hoehen, src.nodata)
+    return ndimage.label(maske, structure=struktur)
+
+def _blockgitter(hoehe, breite, blockgroesse):
+    return {(i, j): Window(spalte, zeile, min(blockgroesse, breite - spalte), min(blockgroesse, hoehe - zeile))
+            for i, zeile in enumerate(range(0, hoehe, blockgroesse))
+            for j, spalte in enumerate(range(0, breite, blockgroesse))}
+
+def _randpaare(a, b, verbindung):
+    """Paare globaler Labels, die sich über eine Blockgrenze berühren (a, b: angrenzende Randpixel)."""
+    verschiebungen = [(slice(None), slice(None))]
+    if verbindung == 8:
+        verschiebungen += [(slice(1, None), slice(None, -1)), (slice(None, -1), slice(1, None))]
+    paare = []
+    for teil_a, teil_b in verschiebungen:
+        beide = (a[teil_a] > 0) & (b[teil_b] > 0)
+        paare.append(np.column_stack([a[teil_a][beide], b[teil_b][beide]]))
+    return paare
+
+def verbundene_labels(dgm_pfad, wasserstand, saat_x, saat_y, blockgroesse=VERBUND_BLOCKGROESSE, verbindung=8):
+    """Blockweise Zusammenhangsanalyse der Flutflächen über das ganze DGM.
+
+    Jeder Block wird einzeln gelabelt; nur die Randzeilen und -spalten (Halo) werden behalten und
+    über Blockgrenzen zu globalen Flächen verbunden. Rückgabe: (Blockgitter, Label-Versatz je Block,
+    Maske der mit einem Saatpunkt verbundenen globalen Labels)
+    """
+    struktur = _struktur(verbindung)
+    with rasterio.open(dgm_pfad) as src:
+        gitter = _blockgitter(src.height, src.width, blockgroesse)
+        saat_rows, saat_cols = _saat_pixel(src.transform, saat_x, saat_y)
+        versatz, raender, saat_labels = {}, {}, []
+        anzahl = 0
+        for (i, j), fenster in gitter.items():
+            labels, n = _label_block(src, fenster, wasserstand, struktur)
+            labels = np.where(labels > 0, labels + anzahl, 0)
+            versatz[(i, j)] = anzahl
+            raender[(i, j)] = {'oben': labels[0], 'unten': labels[-1], 'links': labels[:, 0], 'rechts': labels[:, -1]}
+            r = saat_rows - fenster.row_off
+            c = saat_cols - fenster.col_off
+            im_block = (r >= 0) & (r < fenster.height) & (c >= 0) & (c < fenster.width)
+            saat_labels.append(labels[r[im_block], c[im_block]])
+            anzahl += n
+
+    # Halo-Austausch: Flächen an gemeinsamen Blockrändern verbinden
+    paare = [np.empty((0, 2), dtype=np.int64)]
+    for (i, j), rand in raender.items():
+        if (i + 1, j) in raender:
+            paare += _randpaare(rand['unten'], raender[(i + 1, j)]['oben'], verbindung)
+        if (i, j + 1) in raender:
+            paare += _randpaare(rand['rechts'], raender[(i, j + 1)]['links'], verbindung)
+        if verbindung == 8 and (i + 1, j + 1) in raender:
+            paare += _randpaare(rand['unten'][-1:], raender[(i + 1, j + 1)]['oben'][:1], 4)
+        if verbindung == 8 and (i + 1, j - 1) in raender:
+            paare += _randpaare(rand['unten'][:1], raender[(i + 1, j - 1)]['oben'][-1:], 4)
+    paare = np.concatenate(paare)
+    graph = sparse.coo_matrix((np.ones(len(paare)), (paare[:, 0], paare[:, 1])), shape=(anzahl + 1, anzahl + 1))
+    _, komponente = connected_components(graph, directed=False)
+
+    saat_labels = np.concatenate(saat_labels)
+    saat_labels = saat_labels[saat_labels > 0]
+    if len(saat_labels) == 0:
+        print("Warnung: Kein Saatpunkt liegt unter dem Wasserstand")
+    verbunden = np.isin(komponente, komponente[saat_labels])
+    verbunden[0] = False
+    return gitter, versatz, verbunden
+
+def schreibe_verbundenes_tiefenraster(dgm_pfad, ziel_pfad, pegelstand_cm, pegelnullpunkt_m, saat_x, saat_y,
+                                      blockgroesse=VERBUND_BLOCKGROESSE, verbindung=8,
+                                      uebersichten=TIEFEN_UEBERSICHTEN):
+    """Wie ``schreibe_tiefenraster``, aber nur für Flächen, die mit den Saatpunkten (Fluss/Pegel) verbunden sind.
+
+    Zwei Durchläufe über die Blöcke: Labels und Ränder sammeln, dann Tiefen der verbundenen
+    Flächen schreiben. Es ist immer nur ein Block im Speicher; für mehrere Kacheln eine VRT übergeben.
+    """
+    wasserstand = absoluter_wasserstand(pegelstand_cm, pegelnullpunkt_m)
+    gitter, versatz, verbunden = verbundene_labels(dgm_pfad, wasserstand, saat_x, saat_y, blockgroesse, verbindung)
+    struktur = _struktur(verbindung)
+
+    with rasterio.open(dgm_pfad) as src:
+        profil = src.profile.copy()
+        profil.update(driver='GTiff', dtype='float32', count=1, nodata=np.nan, tiled=True,
+                      blockxsize=TIEFEN_BLOCKGROESSE, blockysize=TIEFEN_BLOCKGROESSE, compress='deflate',
+                      predictor=3, BIGTIFF='IF_SAFER')
+        with rasterio.open(ziel_pfad, 'w', **profil) as dst:
+            for schluessel, fenster in gitter.items():
+                hoehen = src.read(1, window=fenster).astype(np.float32)
+                labels, _ = _label_block(src, fenster, wasserstand, struktur)
+                labels = np.where(labels > 0, labels + versatz[schluessel], 0)
+                tiefe = np.where(verbunden[labels], np.float32(wasserstand) - hoehen, np.float32(0))
+                tiefe[_nodata_maske(hoehen, src.nodata)] = np.nan
+                dst.write(tiefe.astype(np.float32), 1, window=fenster)
+
+            uebersichten = [faktor for faktor in uebersichten
+                            if max(src.height, src.width) // faktor >= TIEFEN_BLOCKGROESSE // 2]
+            if uebersichten:
+                dst.build_overviews(uebersichten, Resampling.average)
+                dst.update_tags(ns='rio_overview', resampling='average')
+    print(f"Verbundenes Tiefenraster geschrieben: {ziel_pfad} ({int(verbunden.sum())} verbundene Teilflächen in {len(gitter)} Blöcken)")
+    return ziel_pfad
+
+def main():
+    # Aufruf: python ueberflutung.py <DGM.tif> <Ziel.tif> <Pegelstand cm> <Pegelnullpunkt m> [<Pegel x> <Pegel y>]
+    dgm_pfad, ziel_pfad, pegelstand_cm, pegelnullpunkt_m = sys.argv[1:5]
+    if len(sys.argv) > 6:
+        schreibe_verbundenes_tiefenraster(dgm_pfad, ziel_pfad, float(pegelstand_cm), float(pegelnullpunkt_m),
+                                          float(sys.argv[5]), float(sys.argv[6]))
+    else:
+        schreibe_tiefenraster(dgm_pfad, ziel_pfad, float(pegelstand_cm), float(pegelnullpunkt_m))
+
+if __name__ == "__main__":
+    main()
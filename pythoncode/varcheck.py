@@ -1,47 +1,32 @@
 import pandas as pd
 import numpy as np
+from einlesen import konvertiere_numerische_spalten
+from physrisiko import berechne_physisches_risiko
+from portfolio_store import lade_portfolio
 
 # Daten einlesen
-df = pd.read_csv('data\hypothekendaten_final_with_statistics.csv', delimiter=';')
-
-# Flexible Konvertierungsfunktion
-def flexible_numeric_conversion(series):
-    if pd.api.types.is_numeric_dtype(series):
-        return series
-    else:
-        return pd.to_numeric(series.str.replace(',', '.'), errors='coerce')
+df = lade_portfolio('data\hypothekendaten_final_with_statistics.csv',
+                   spalten=['aktuelles_LtV', 'darlehenbetrag', 'aktueller_immobilienwert', 'Schadensfaktor', 'AEP', 'Risikogewicht'])
 
 # Umwandlung der Spalten in numerische Formate
 numeric_columns = ['aktuelles_LtV', 'darlehenbetrag', 'aktueller_immobilienwert', 'Schadensfaktor', 'AEP', 'Risikogewicht']
-for col in numeric_columns:
-    if col in df.columns:
-        df[col] = flexible_numeric_conversion(df[col])
+konvertiere_numerische_spalten(df, numeric_columns)
 
 # Filterung der Zeilen mit 'Schadensfaktor' > 0 und Entfernung von NaN-Werten
 df = df[df['Schadensfaktor'] > 0].dropna(subset=numeric_columns)
 
-# Funktion zur Berechnung neuer Werte mit detailliertem Debugging
-def calculate_values_detailed(row):
-    aktueller_immobilienwert = row['aktueller_immobilienwert']
-    schadenfaktor = row['Schadensfaktor']
-    darlehenbetrag = row['darlehenbetrag']
-    
-    immobilienschaden = aktueller_immobilienwert * schadenfaktor
-    new_immobilienwert = aktueller_immobilienwert - immobilienschaden
-    new_LtV = darlehenbetrag / new_immobilienwert if new_immobilienwert > 0 else float('inf')
-    
+# Berechnung neuer Werte spaltenweise mit der gemeinsamen Risiko-Engine
+ergebnisse = berechne_physisches_risiko(df)
+details = pd.DataFrame({
+    'Neuer Immobilienwert': ergebnisse['Neuer Immobilienwert'],
+    'Neue LtV': ergebnisse['Neue LtV'],
+    'Berechneter Schaden': ergebnisse['Immobilienschaden'],
     # Berechnung des alten LTV nach einfacher Formel
-    calculated_old_LtV = darlehenbetrag / aktueller_immobilienwert
-    
-    return pd.Series({
-        'Neuer Immobilienwert': new_immobilienwert,
-        'Neue LtV': new_LtV,
-        'Berechneter Schaden': immobilienschaden,
-        'Berechnetes altes LtV': calculated_old_LtV
-    })
+    'Berechnetes altes LtV': df['darlehenbetrag'] / df['aktueller_immobilienwert']
+})
 
-# Anwendung der Berechnung und Zusammenführung der Ergebnisse
-df_results = pd.concat([df, df.apply(calculate_values_detailed, axis=1)], axis=1)
+# Zusammenführung der Ergebnisse
+df_results = pd.concat([df, details], axis=1)
 
 # Überprüfung der Anzahl der Fälle, in denen das neue LTV höher ist als das alte LTV
 ltv_increased = (df_results['Neue LtV'] > df_results['aktuelles_LtV']).sum()
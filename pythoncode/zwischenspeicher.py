@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+import tempfile
+
+# Vorbereitete Geodaten (GeoParquet) mit den Hashes ihrer Quelldateien in einer JSON-Datei daneben
+
+def datei_sha256(pfad, blockgroesse=1024 * 1024):
+    h = hashlib.sha256()
+    with open(pfad, 'rb') as f:
+        for block in iter(lambda: f.read(blockgroesse), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _stand_datei(ziel):
+    return ziel + '.quellen.json'
+
+def quellen_stand(quellen, alter_stand=None):
+    """Größe, Änderungszeit und SHA-256 der Quelldateien {Name: Pfad}.
+
+    Der Hash wird nur neu berechnet, wenn sich Größe oder Änderungszeit gegenüber ``alter_stand`` geändert haben.
+    """
+    alter_stand = alter_stand or {}
+    stand = {}
+    for name, pfad in quellen.items():
+        info = os.stat(pfad)
+        eintrag = {'groesse': info.st_size, 'mtime_ns': info.st_mtime_ns}
+        alt = alter_stand.get(name, {})
+        if alt.get('groesse') == eintrag['groesse'] and alt.get('mtime_ns') == eintrag['mtime_ns']:
+            eintrag['sha256'] = alt['sha256']
+        else:
+            eintrag['sha256'] = datei_sha256(pfad)
+        stand[name] = eintrag
+    return stand
+
+def ist_aktuell(ziel, quellen):
+    """Prüft, ob ``ziel`` aus den aktuellen Quelldateien erstellt wurde (gleiche SHA-256)."""
+    if not (os.path.exists(ziel) and os.path.exists(_stand_datei(ziel))):
+        return False
+    with open(_stand_datei(ziel), encoding='utf-8') as f:
+        alter_stand = json.load(f)
+    stand = quellen_stand(quellen, alter_stand)
+    return all(stand[name]['sha256'] == alter_stand.get(name, {}).get('sha256') for name in stand)
+
+def _teildatei(ziel):
+    """Eindeutige Teildatei neben ``ziel``, damit gleichzeitige Schreiber sich nicht überschreiben."""
+    fd, teil = tempfile.mkstemp(prefix=os.path.basename(ziel) + '.', suffix='.part', dir=os.path.dirname(ziel) or '.')
+    os.close(fd)
+    return teil
+
+def schreibe_geoparquet(gdf, ziel, quellen):
+    """Schreibt ``gdf`` als GeoParquet und speichert den Stand der Quelldateien daneben."""
+    os.makedirs(os.path.dirname(ziel) or '.', exist_ok=True)
+    teil = _teildatei(ziel)
+    try:
+        gdf.to_parquet(teil, index=False, compression='zstd', write_covering_bbox=True)
+        os.replace(teil, ziel)
+        # Stand ebenfalls erst vollständig schreiben und dann umbenennen
+        teil = _teildatei(_stand_datei(ziel))
+        with open(teil, 'w', encoding='utf-8') as f:
+            json.dump(quellen_stand(quellen), f, indent=2)
+        os.replace(teil, _stand_datei(ziel))
+    finally:
+        if os.path.exists(teil):
+            os.unlink(teil)